@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+"""
+Exact meet-in-the-middle solver for small pure-binary programs: a linear objective and a
+handful of linear constraints over up to about 40 binary variables.
+Small selection models like module3_hw_prob1.py, module3_hw_prob3.py and budget_example_1(1).py
+can be solved this way in milliseconds, without Pyomo or a solver binary.
+
+The variables are split in half, every selection of each half is enumerated with NumPy,
+and the halves are joined by sorting one side by value, dropping dominated selections,
+and finding the best feasible partner for each selection of the other side.
+"""
+# Import
+import numpy as np
+from time import perf_counter
+
+tolerance = 1e-9 # Slack allowed when checking constraints with float coefficients
+dominanceLimit = 4096 # Largest half for the pairwise dominance filter with several constraints
+joinCellLimit = 2**22 # Size of the (left x right x constraint) feasibility block checked at once
+
+def enumerateHalf(objective, constraintMatrix, columns):
+    # Every selection of the given variables: [resource usage, objective value].
+    # Selection s sets columns[j] to 1 if bit j of s is 1; the list doubles with each variable.
+    usage = np.zeros((1, constraintMatrix.shape[0]))
+    value = np.zeros(1)
+    for j in columns:
+        usage = np.concatenate((usage, usage + constraintMatrix[:, j]))
+        value = np.concatenate((value, value + objective[j]))
+    return [usage, value]
+
+def selectionBits(selection, numColumns):
+    # 0/1 value of each variable in an enumerated selection
+    return [(int(selection) >> j) & 1 for j in range(numColumns)]
+
+def dominanceFilter(usage, value):
+    ''' Keep only selections that no other selection beats on value while using no more of every resource
+    usage: resource usage of each selection (numpy array, selections x constraints)
+    value: objective value of each selection (numpy array)
+    Returns the indices of the kept selections, sorted by value, best first.
+    '''
+    order = np.argsort(-value, kind='stable') # Best value first
+    if usage.shape[1] == 0: # No constraints: only the best selection matters
+        return order[:1]
+
+    # Of selections with identical usage, keep the most valuable (np.unique keeps first occurrences)
+    uniqueIndex = np.unique(usage[order], axis=0, return_index=True)[1]
+    order = order[np.sort(uniqueIndex)]
+
+    if usage.shape[1] == 1: # One constraint: keep selections that use less than every more valuable one
+        orderedUsage = usage[order, 0]
+        keep = np.ones(order.size, dtype=bool)
+        keep[1:] = orderedUsage[1:] < np.minimum.accumulate(orderedUsage)[:-1]
+        return order[keep]
+
+    if order.size > dominanceLimit: # Pairwise filter would cost too much; the join still finds the optimum
+        return order
+    orderedUsage = usage[order]
+    dominated = np.zeros(order.size, dtype=bool)
+    for j in range(order.size): # Selections before j are at least as valuable
+        if not dominated[j]:
+            dominated[j+1:] |= np.all(orderedUsage[j] <= orderedUsage[j+1:], axis=1)
+    return order[~dominated]
+
+def solveBinaryProgram(objective, constraintMatrix, senses, rhs, maximize=True):
+    ''' Input data
+    objective: objective coefficient of each variable (list; objective[0] is variable 1)
+    constraintMatrix: coefficients of each constraint, one row per constraint (list of lists)
+    senses: sense of each constraint, '<=', '>=' or '==' (list)
+    rhs: right-hand side of each constraint (list)
+    maximize: True to maximize the objective, False to minimize (bool)
+    Returns [selected, objectiveValue], where selected is the sorted list of variables set to 1,
+    numbered from 1, or None if the problem is infeasible.
+    '''
+    numVars = len(objective)
+    c = np.array(objective, dtype=float) if maximize else -np.array(objective, dtype=float)
+
+    # Write every constraint as one or two "<=" rows
+    rows = []
+    bounds = []
+    for row, sense, bound in zip(constraintMatrix, senses, rhs):
+        if sense in ['<=', '==']:
+            rows.append([float(a) for a in row])
+            bounds.append(float(bound))
+        if sense in ['>=', '==']:
+            rows.append([-float(a) for a in row])
+            bounds.append(-float(bound))
+    A = np.array(rows, dtype=float).reshape(len(rows), numVars)
+    b = np.array(bounds, dtype=float)
+
+    # Enumerate each half, dropping selections that can't be feasible whatever the other half does
+    leftColumns = list(range(numVars // 2))
+    rightColumns = list(range(numVars // 2, numVars))
+    leftUsage, leftValue = enumerateHalf(c, A, leftColumns)
+    rightUsage, rightValue = enumerateHalf(c, A, rightColumns)
+    leftMinimum = np.minimum(A[:, leftColumns], 0).sum(axis=1) # Least usage the left half can contribute
+    rightMinimum = np.minimum(A[:, rightColumns], 0).sum(axis=1)
+    leftKeep = np.flatnonzero(np.all(leftUsage + rightMinimum <= b + tolerance, axis=1))
+    rightKeep = np.flatnonzero(np.all(rightUsage + leftMinimum <= b + tolerance, axis=1))
+
+    # Incumbent: a left selection with nothing on the right, or the other way round
+    bestValue = -np.inf
+    bestPair = None # (left selection, right selection), by enumeration index
+    leftAlone = leftKeep[np.all(leftUsage[leftKeep] <= b + tolerance, axis=1)]
+    rightAlone = rightKeep[np.all(rightUsage[rightKeep] <= b + tolerance, axis=1)]
+    if leftAlone.size > 0:
+        best = leftAlone[leftValue[leftAlone].argmax()]
+        bestValue, bestPair = leftValue[best], (best, 0)
+    if rightAlone.size > 0 and rightValue[rightAlone].max() > bestValue:
+        best = rightAlone[rightValue[rightAlone].argmax()]
+        bestValue, bestPair = rightValue[best], (0, best)
+
+    # Right half: sorted by value, best first, without dominated selections
+    rightKeep = rightKeep[dominanceFilter(rightUsage[rightKeep], rightValue[rightKeep])]
+    keptUsage = rightUsage[rightKeep]
+    keptValue = rightValue[rightKeep]
+
+    if b.size == 1 and leftKeep.size > 0 and rightKeep.size > 0:
+        # One constraint: the kept right selections get more valuable as they use more, so the best
+        # partner of each left selection is the heaviest one that still fits (binary search)
+        ascendingUsage = keptUsage[::-1, 0]
+        partner = np.searchsorted(ascendingUsage, b[0] - leftUsage[leftKeep, 0] + tolerance, side='right') - 1
+        hasPartner = partner >= 0
+        if hasPartner.any():
+            matchedLeft = leftKeep[hasPartner]
+            matchedRight = rightKeep.size - 1 - partner[hasPartner]
+            totals = leftValue[matchedLeft] + keptValue[matchedRight]
+            best = totals.argmax()
+            if totals[best] > bestValue + tolerance:
+                bestValue, bestPair = totals[best], (matchedLeft[best], rightKeep[matchedRight[best]])
+        leftKeep = leftKeep[:0] # Nothing left to join
+
+    # Join: the first feasible right selection (in value order) is the best partner for a left selection
+    unmatched = leftKeep
+    start = 0
+    while unmatched.size > 0 and start < rightKeep.size:
+        unmatched = unmatched[leftValue[unmatched] + keptValue[start] > bestValue + tolerance] # Others can't beat incumbent
+        if unmatched.size == 0:
+            break
+        stop = min(rightKeep.size, start + max(1, joinCellLimit // (unmatched.size * max(1, b.size))))
+        feasible = np.all(leftUsage[unmatched][:, None, :] + keptUsage[None, start:stop, :] <= b + tolerance, axis=2)
+        hasMatch = feasible.any(axis=1)
+        if hasMatch.any():
+            matchedLeft = unmatched[hasMatch]
+            matchedRight = start + feasible[hasMatch].argmax(axis=1)
+            totals = leftValue[matchedLeft] + keptValue[matchedRight]
+            best = totals.argmax()
+            if totals[best] > bestValue + tolerance:
+                bestValue, bestPair = totals[best], (matchedLeft[best], rightKeep[matchedRight[best]])
+        unmatched = unmatched[~hasMatch]
+        start = stop
+
+    if bestPair is None:
+        print("Problem is infeasible.")
+        return None
+    selectedBits = selectionBits(bestPair[0], len(leftColumns)) + selectionBits(bestPair[1], len(rightColumns))
+    selected = [i + 1 for i in range(numVars) if selectedBits[i] == 1]
+    return [selected, sum(objective[i-1] for i in selected)]
+
+if __name__ == "__main__":
+    # Chapter 9, Problem 1, as in module3_hw_prob1.py: choose at least 5 sites at least cost
+    startTime = perf_counter()
+    selected, objectiveValue = solveBinaryProgram(
+        [5,3,4,2,7,3,3,5,4,6],
+        [[1,1,1,1,1,1,1,1,1,1], # At least 5 sites
+         [1,0,0,0,0,0,1,1,0,0], # SELECT[8] <= 2 - SELECT[1] - SELECT[7]
+         [0,0,1,0,1,0,0,0,0,0], # SELECT[5] <= 1 - SELECT[3]
+         [0,0,0,1,1,0,0,0,0,0], # SELECT[5] <= 1 - SELECT[4]
+         [0,0,0,0,1,1,1,1,0,0]], # SELECT[5] + SELECT[6] + SELECT[7] + SELECT[8] <= 2
+        ['>=', '<=', '<=', '<=', '<='], [5, 2, 1, 1, 2], maximize=False)
+    print("Problem 1: sites " + str(selected) + ", cost " + str(objectiveValue) + " (" + str(round(perf_counter() - startTime, 4)) + " sec)")
+
+    # Chapter 9, Problem 3, as in module3_hw_prob3.py: choose advertising options to reach the most customers
+    startTime = perf_counter()
+    selected, objectiveValue = solveBinaryProgram(
+        [1000000,200000,300000,400000,450000,450000],
+        [[500000,150000,300000,250000,250000,100000], # Money available
+         [700,250,200,200,300,400], # Designer hours available
+         [200,100,100,100,100,1000], # Salesperson hours available
+         [0,0,0,-1,-1,1], # SELECT[4] + SELECT[5] >= SELECT[6]
+         [0,1,0,0,1,0]], # SELECT[2] + SELECT[5] <= 1
+        ['<=', '<=', '<=', '<=', '<='], [1800000, 1500, 1200, 0, 1])
+    print("Problem 3: options " + str(selected) + ", customers " + str(objectiveValue) + " (" + str(round(perf_counter() - startTime, 4)) + " sec)")
+
+    # Disaster relief budget, as in budget_example_1(1).py
+    startTime = perf_counter()
+    selected, objectiveValue = solveBinaryProgram(
+        [5,2,2,3,5,5,1,5,4],
+        [[50,20,25,1,100,50,1,10,1], # Budget
+         [0,1,0,-1,0,0,0,0,0], # SELECT[4] >= SELECT[2]
+         [0,0,1,-1,0,0,0,0,0], # SELECT[4] >= SELECT[3]
+         [0,0,0,1,0,-1,0,0,0], # SELECT[6] >= SELECT[4]
+         [0,0,0,0,1,-1,0,0,0], # SELECT[6] >= SELECT[5]
+         [0,0,0,0,0,-1,1,0,0], # SELECT[6] >= SELECT[7]
+         [1,1,1,0,0,0,0,0,0], # 2 - SELECT[2] - SELECT[3] >= SELECT[1]
+         [1,1,0,0,0,0,0,0,0], # 1 - SELECT[1] >= SELECT[2]
+         [1,0,1,0,0,0,0,0,0]], # 1 - SELECT[1] >= SELECT[3]
+        ['<=', '<=', '<=', '<=', '<=', '<=', '<=', '<=', '<='], [175, 0, 0, 0, 0, 0, 2, 1, 1])
+    print("Budget example: items " + str(selected) + ", benefit " + str(objectiveValue) + " (" + str(round(perf_counter() - startTime, 4)) + " sec)")
+    print("")
+
+    # Larger random instances: knapsacks with one or three constraints
+    rng = np.random.default_rng(1) # Set random seed
+    for numVars, numConstraints in [(20, 3), (24, 3), (30, 1), (40, 1)]:
+        objective = rng.integers(1, 100, numVars).tolist()
+        constraintMatrix = rng.integers(1, 50, (numConstraints, numVars)).tolist()
+        rhs = [sum(row) // 3 for row in constraintMatrix]
+        startTime = perf_counter()
+        selected, objectiveValue = solveBinaryProgram(objective, constraintMatrix, ['<='] * numConstraints, rhs)
+        print(str(numVars) + " variables, " + str(numConstraints) + " constraints: objective " + str(objectiveValue) +
+              " (" + str(round(perf_counter() - startTime, 4)) + " sec)")
@@ -9,6 +9,7 @@ Uses lazy constraint callbacks.
 
 Requirements: 
  - CPLEX (or other Pyomo-compatible solver)
+ - docplex for the packing subproblem (optional: packing_native.py is used without it)
 """
 # Import 
 from pyomo.environ import *
@@ -16,8 +17,17 @@ from pyomo.opt import *
 from pyomo.core import * 
 import cplex
 from cplex.callbacks import LazyConstraintCallback
-
-from packing_subproblem import * # For running packing CSP using constraint programming 
+from time import perf_counter
+
+try:
+    from packing_subproblem import * # For running packing CSP using constraint programming 
+except ImportError:
+    from packing_native import solvePackingSubproblem, findPacking # No docplex: exact packing search in Python
+from packing_cache import PackingCache, canonicalPackingKey # For reusing packing results across callbacks (and runs)
+from packing_prefilter import TieredPackingCheck # For settling easy packing checks without the CP model
+from packing_warmstart import WarmStartPacking # For packing around each truck's last feasible placement
+from feasibility_index import MonotoneFeasibilityIndex, packingElements # For answering subsets/supersets of known results
+from subproblem_pool import SubproblemPool # For solving the packing subproblems of all trucks in parallel
 
 # Global variables, to be able to access this data in the lazy constraint callback
 numBoxes = 0 # Total number of boxes 
@@ -25,6 +35,13 @@ numContainers = 0 # Number of containers (trucks)
 boxSize = {} # Dict of box sizes, by (box, dim, orientation)
 containerSize = {} # Dict of container (truck) sizes, in each of three dimensions [d1, d2, d3]
 numLazyConstraints = 0 # Number of lazy constraints added 
+packingCache = None # Cache of packing subproblem results, by box and container dimensions
+tieredCheck = None # Volume/size bounds and heuristic packer, run before the CP packing model
+warmStart = None # Last feasible placement for each container size, reused for the next load
+feasibilityIndex = None # Known feasible/infeasible sets of boxes, by container dimensions
+subproblemPool = None # Worker processes for solving packing subproblems in parallel
+minimizeCuts = True # Shrink each infeasible load to a minimal infeasible subset before adding cuts
+callbackTime = 0 # Total wall time spent in the lazy constraint callback (sec)
 
 def generateRandomData(numBoxes, numContainers):
     # Generate random data and return data structures
@@ -65,6 +82,79 @@ def generateRandomData(numBoxes, numContainers):
 
     return costs, boxSize, containerSize 
 
+def checkPackings(loads):
+    ''' Determine which of several loads fit, using known results and fast checks where possible,
+    and solving the rest in parallel in the subproblem pool.
+    A subset of boxes that fit also fits, and a superset of boxes that don't fit doesn't fit either.
+    loads: the boxes and container size of each load, as [theBoxes, theContainerSize] (list)
+    Returns a list with True for each load that fits, False for each load that doesn't, and None for each
+    load whose solve reached its time limit (not known either way, so not cached or indexed).
+    '''
+    global boxSize
+    global feasibilityIndex
+    global packingCache
+    global tieredCheck
+    global warmStart
+    global subproblemPool
+    results = [None] * len(loads)
+    pending = {} # Canonical key: loads needing a solve with this key (solved once)
+    for n, (theBoxes, theContainerSize) in enumerate(loads):
+        context, elements = packingElements(theBoxes, boxSize, theContainerSize)
+        results[n] = feasibilityIndex.lookup(context, elements)
+        if results[n] is not None:
+            continue
+        key = canonicalPackingKey(theBoxes, boxSize, theContainerSize)
+        if key not in pending:
+            results[n] = packingCache.lookup(key)
+            if results[n] is None:
+                results[n] = tieredCheck.quickCheck(theBoxes, boxSize, theContainerSize)
+                if results[n] is None and warmStart.quickCheck(theBoxes, boxSize, theContainerSize):
+                    results[n] = True # Counted in warmStart's statistics, not as a CP solve
+                if results[n] is not None:
+                    packingCache.store(key, results[n])
+        if results[n] is None:
+            pending.setdefault(key, []).append(n)
+        else:
+            feasibilityIndex.record(context, elements, results[n])
+
+    # Exact solves, all at once
+    tasks = []
+    for key in pending:
+        theBoxes, theContainerSize = loads[pending[key][0]]
+        theBoxSize = {(b,d,o): boxSize[b,d,o] for b in theBoxes for d in range(1,4) for o in range(1,3)}
+        tasks.append([(theBoxes, theBoxSize, theContainerSize), {'startingPlacement': warmStart.startingPlacement(theBoxes, theContainerSize)}])
+    solutions = subproblemPool.solveAll(findPacking, tasks)
+    for key, (placement, timedOut) in zip(pending, solutions):
+        theBoxes, theContainerSize = loads[pending[key][0]]
+        isFeasible = tieredCheck.decide('CP', warmStart.recordSolve(theBoxes, theContainerSize, placement))
+        if timedOut: # Not proven infeasible, so don't keep it
+            for n in pending[key]:
+                results[n] = None
+            continue
+        packingCache.store(key, isFeasible)
+        for n in pending[key]:
+            results[n] = isFeasible
+            context, elements = packingElements(loads[n][0], boxSize, loads[n][1])
+            feasibilityIndex.record(context, elements, isFeasible)
+    return results
+
+def minimalInfeasibleSubsets(loads):
+    # Deletion filter, for several loads that don't fit: drop each box in turn, keeping it out if the rest still doesn't fit.
+    # Each result doesn't fit, but every proper subset of it does (given exact packing checks).
+    # A check that reaches its time limit counts as fitting, so the box is kept and the result still doesn't fit.
+    # The loads take their steps together, so each step's packing checks are solved in parallel.
+    global boxSize
+    cores = [list(theBoxes) for theBoxes, theContainerSize in loads]
+    dropOrders = [sorted(theBoxes, key=lambda b: boxSize[b,1,1] * boxSize[b,2,1] * boxSize[b,3,1]) for theBoxes, theContainerSize in loads] # Try dropping small boxes first
+    for step in range(max([len(dropOrder) for dropOrder in dropOrders], default=0)):
+        active = [n for n in range(len(loads)) if step < len(dropOrders[n])]
+        candidates = [[x for x in cores[n] if x != dropOrders[n][step]] for n in active]
+        results = checkPackings([[candidate, loads[n][1]] for n, candidate in zip(active, candidates)])
+        for n, candidate, isFeasible in zip(active, candidates, results):
+            if isFeasible is False: # Proven not to fit (None: time limit reached)
+                cores[n] = candidate
+    return cores
+
 def objective_rule(model):
     # Create objective function
     return sum(model.cost[b,t] * model.ASSIGN[b,t] for b in model.b for t in model.t)
@@ -85,36 +175,66 @@ class cplexLazyConstraintCallback(LazyConstraintCallback):
         global boxSize
         global containerSize
         global numLazyConstraints
+        global minimizeCuts
+        global callbackTime
+        startTime = perf_counter()
 
         # Read in values of current assignments
+        loads = []
+        variableLists = [] # For each container, list of string names of the active variables, if needed in lazy constraint
         for t in range(1,numContainers+1):
             theBoxes = []
-            variableList = [] # # Create list of string names of the active variables, if needed in lazy constraint
+            variableList = []
             theContainerSize = containerSize[t] # Get list of dimensions for this container
             for b in range(1, numBoxes+1):
                 if self.get_values('ASSIGN(' + str(b) + '_' + str(t) + ')') > 0: # If this box assigned to this container
                     theBoxes.append(b)
                     variableList.append('ASSIGN(' + str(b) + '_' + str(t) + ')')
+            loads.append([theBoxes, theContainerSize])
+            variableLists.append(variableList)
 
-            # Run constraint programming problem to determine if these boxes fit in this container
-            isFeasible = solvePackingSubproblem(theBoxes, boxSize, theContainerSize)
+        # Determine if the boxes fit in each container (solving constraint programming problems in parallel, unless already known)
+        results = checkPackings(loads)
+        infeasibleContainers = [t for t in range(1,numContainers+1) if not results[t-1]] # Including loads whose solve timed out
+        if minimizeCuts: # Cut off only a minimal set of boxes that don't fit, in every container of this size
+            provenContainers = [t for t in infeasibleContainers if results[t-1] is False]
+            cores = dict(zip(provenContainers, minimalInfeasibleSubsets([loads[t-1] for t in provenContainers])))
 
-            if not isFeasible: # Scheduling problem was infeasible; add cut
+        # Add all cuts in one pass
+        for t in range(1,numContainers+1):
+            if results[t-1]:
+                print("Feasible assignment of boxes to container " + str(t))
+        for t in infeasibleContainers:
+            theContainerSize = containerSize[t]
+            if minimizeCuts and t in cores:
+                core = cores[t]
+                print("Infeasible assignment in container " + str(t) + "; adding cuts for boxes " + str(core) + "...")
+                for otherT in range(1,numContainers+1):
+                    if containerSize[otherT] == theContainerSize:
+                        variableList = ['ASSIGN(' + str(b) + '_' + str(otherT) + ')' for b in core]
+                        coefficientList = [1] * len(variableList) # Create list of the coefficients 
+                        self.add([variableList,coefficientList], "L", len(variableList)-1) # At least one of these boxes can't be assigned to this container
+                        numLazyConstraints += 1
+            else: # Packing problem was infeasible (or timed out); add cut
                 print("Infeasible assignment in container " + str(t) + "; adding cut...")
+                variableList = variableLists[t-1]
                 coefficientList = [1] * len(variableList) # Create list of the coefficients 
                 self.add([variableList,coefficientList], "L", len(variableList)-1) # Add a cut that says at least one of these boxes can't be assigned to this box
                 numLazyConstraints += 1
                 print("The variableList is " + str(variableList))
-            else:
-                print("Feasible assignment of boxes to container " + str(t))
 
-def SolveUsingPyomoCPLEX_LP(theNumBoxes, theNumContainers, costs, theBoxSize, theContainerSize):
+        callbackTime += perf_counter() - startTime
+
+def SolveUsingPyomoCPLEX_LP(theNumBoxes, theNumContainers, costs, theBoxSize, theContainerSize, cacheFileName=None, theMinimizeCuts=True, numWorkers=None):
     ''' Create and solve a concrete Pyomo model and CPLEX interface (to allow lazy constraint callbacks) 
     theNumBoxes: Number of boxes (int)
     theNumContainers: Number of containers (trucks) (int)
     costs: Dict of costs of assigning a box to a container (b,t):cost
     theBoxSize: Dict of box sizes, by (box, dim, orientation)
     theContainerSize: Dict of container (truck) sizes, in each of three dimensions [d1, d2, d3]
+    cacheFileName: File for keeping packing subproblem results between runs (optional)
+    theMinimizeCuts: If True, cut off minimal infeasible subsets of boxes; if False, whole infeasible loads (bool)
+    numWorkers: Number of worker processes for packing subproblems (int; default: one per CPU)
     '''
 
     # Initialize data structures (globally, for use in callback)
@@ -127,6 +247,21 @@ def SolveUsingPyomoCPLEX_LP(theNumBoxes, theNumContainers, costs, theBoxSize, th
     global containerSize
     containerSize = theContainerSize
     global numLazyConstraints
+    global minimizeCuts
+    minimizeCuts = theMinimizeCuts
+    global callbackTime
+    # checkPackings runs the cache, fast checks, warm start and exact packer itself (so the exact solves can be
+    # batched in the pool), so none of these is given a solver to call
+    global warmStart
+    warmStart = WarmStartPacking()
+    global tieredCheck
+    tieredCheck = TieredPackingCheck(onPlacement=warmStart.remember)
+    global packingCache
+    packingCache = PackingCache(cacheFileName=cacheFileName)
+    global feasibilityIndex
+    feasibilityIndex = MonotoneFeasibilityIndex()
+    global subproblemPool
+    subproblemPool = SubproblemPool(numWorkers) # Started before CPLEX, and kept for the whole solve
 
     # Create a concrete Pyomo model
     print("Building Pyomo model...")
@@ -183,6 +318,14 @@ def SolveUsingPyomoCPLEX_LP(theNumBoxes, theNumContainers, costs, theBoxSize, th
     
     # Print results (this is hard-coded to be specific to this problem)
     print("The total number of lazy constraints is: " + str(numLazyConstraints))
+    print("Total time in lazy constraint callback: " + str(round(callbackTime, 2)) + " sec")
+    print(feasibilityIndex.stats())
+    print(packingCache.stats())
+    print(tieredCheck.stats())
+    print(warmStart.stats())
+    print(subproblemPool.stats())
+    packingCache.close()
+    subproblemPool.close()
     print("The objective value is: " + str(results.get_objective_value()))
     for b in model.b:
         for t in model.t:
@@ -190,27 +333,28 @@ def SolveUsingPyomoCPLEX_LP(theNumBoxes, theNumContainers, costs, theBoxSize, th
                 print("Box " + str(b) + " is assigned to container " + str(t) + ", at a cost of " + str(model.cost[b,t]))
 
 
-# Small dataset, for testing
-numBoxes = 5 # Number of boxes
-numContainers = 3 # Number of containers (trucks)
-costs = {(1,1):1, (1,2):2, (1,3):3, # Costs of assigning a box to a container
-            (2,1):1, (2,2):2, (2,3):3,
-            (3,1):1, (3,2):2, (3,3):3,
-            (4,1):1, (4,2):2, (4,3):3,
-            (5,1):1, (5,2):2, (5,3):3 } 
-# Dict of box sizes, by (box, dim, orientation)
-boxSize = { (1,1,1):1, (1,1,2):1, (1,2,1):1, (1,2,2):1, (1,3,1):1, (1,3,2):1, 
-            (2,1,1):2, (2,1,2):2, (2,2,1):2, (2,2,2):2, (2,3,1):2, (2,3,2):2,
-            (3,1,1):1, (3,1,2):4, (3,2,1):4, (3,2,2):1, (3,3,1):1, (3,3,2):1,
-            (4,1,1):2, (4,1,2):5, (4,2,1):5, (4,2,2):2, (4,3,1):2, (4,3,2):2,
-            (5,1,1):1, (5,1,2):3, (5,2,1):3, (5,2,2):1, (5,3,1):3, (5,3,2):3 } 
-
-# Dict of container (truck) sizes, in each of three dimensions [d1, d2, d3]
-containerSize = {1:[3,6,5], 2:[4,4,4], 3:[5,8,5]} 
-
-# Use this to generate random data.  Otherwise, just comment this to use above test data. 
-numBoxes = 20
-numContainers = 8 # 8 works, 7 works but takes about 60 sec  
-costs, boxSize, containerSize = generateRandomData(numBoxes, numContainers)
-
-SolveUsingPyomoCPLEX_LP(numBoxes, numContainers, costs, boxSize, containerSize) # Run above code 
\ No newline at end of file
+if __name__ == "__main__": # Only when run directly, not when worker processes import this file
+    # Small dataset, for testing
+    numBoxes = 5 # Number of boxes
+    numContainers = 3 # Number of containers (trucks)
+    costs = {(1,1):1, (1,2):2, (1,3):3, # Costs of assigning a box to a container
+                (2,1):1, (2,2):2, (2,3):3,
+                (3,1):1, (3,2):2, (3,3):3,
+                (4,1):1, (4,2):2, (4,3):3,
+                (5,1):1, (5,2):2, (5,3):3 } 
+    # Dict of box sizes, by (box, dim, orientation)
+    boxSize = { (1,1,1):1, (1,1,2):1, (1,2,1):1, (1,2,2):1, (1,3,1):1, (1,3,2):1, 
+                (2,1,1):2, (2,1,2):2, (2,2,1):2, (2,2,2):2, (2,3,1):2, (2,3,2):2,
+                (3,1,1):1, (3,1,2):4, (3,2,1):4, (3,2,2):1, (3,3,1):1, (3,3,2):1,
+                (4,1,1):2, (4,1,2):5, (4,2,1):5, (4,2,2):2, (4,3,1):2, (4,3,2):2,
+                (5,1,1):1, (5,1,2):3, (5,2,1):3, (5,2,2):1, (5,3,1):3, (5,3,2):3 } 
+
+    # Dict of container (truck) sizes, in each of three dimensions [d1, d2, d3]
+    containerSize = {1:[3,6,5], 2:[4,4,4], 3:[5,8,5]} 
+
+    # Use this to generate random data.  Otherwise, just comment this to use above test data. 
+    numBoxes = 20
+    numContainers = 8 # 8 works, 7 works but takes about 60 sec  
+    costs, boxSize, containerSize = generateRandomData(numBoxes, numContainers)
+
+    SolveUsingPyomoCPLEX_LP(numBoxes, numContainers, costs, boxSize, containerSize) # Run above code 
\ No newline at end of file
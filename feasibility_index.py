@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""
+Subset/superset index of feasibility results for the packing and scheduling subproblems.
+Feasibility is monotone in both: every subset of a feasible set of boxes (or jobs) is
+feasible, and every superset of an infeasible set is infeasible.  So before building a
+CP model, the index checks whether the new set is contained in a known feasible set, or
+contains a known infeasible set, for the same container (or worksite).
+
+Sets are stored as bitmasks (Python integers).  Only maximal feasible sets and minimal
+infeasible sets are kept, since the others can't answer anything those can't.
+"""
+
+def multisetElements(values):
+    # Turn a multiset into a set: the k-th copy of a value becomes the element (value, k)
+    counts = {}
+    elements = []
+    for value in sorted(values):
+        counts[value] = counts.get(value, 0) + 1
+        elements.append((value, counts[value]))
+    return elements
+
+def packingElements(theBoxes, boxSize, containerSize):
+    ''' Input data: as in solvePackingSubproblem
+    Returns [context, elements]: the container dimensions, and the boxes as a set of shapes
+    (each the sorted pair of its two orientations).  Containers are mirrored so that
+    dimension 1 is no longer than dimension 2, swapping those dimensions of every box too,
+    so that mirror-image trucks share results.
+    '''
+    mirror = containerSize[1] < containerSize[0]
+    shapes = []
+    for b in theBoxes:
+        orientations = []
+        for o in range(1,3):
+            dims = (boxSize[b,1,o], boxSize[b,2,o], boxSize[b,3,o])
+            orientations.append((dims[1], dims[0], dims[2]) if mirror else dims)
+        shapes.append(tuple(sorted(orientations)))
+    context = (containerSize[1], containerSize[0], containerSize[2]) if mirror else tuple(containerSize)
+    return [context, multisetElements(shapes)]
+
+def schedulingElements(totalTime, availResources, jobLength):
+    ''' Input data: as in solveSchedulingSubproblem
+    Returns [context, elements]: the time and machines available, and the jobs as a set of lengths.
+    '''
+    return [(int(availResources), totalTime), multisetElements(jobLength)]
+
+class MonotoneFeasibilityIndex:
+    ''' Known feasible and infeasible sets, by context (e.g. container dimensions) '''
+    def __init__(self):
+        self.elementBits = {} # Element: bit position
+        self.feasibleSets = {} # Context: list of maximal known feasible sets (bitmasks)
+        self.infeasibleSets = {} # Context: list of minimal known infeasible sets (bitmasks)
+        self.numLookups = 0
+        self.numSolvesSaved = 0 # Lookups answered from the index
+
+    def toMask(self, elements):
+        mask = 0
+        for element in elements:
+            if element not in self.elementBits:
+                self.elementBits[element] = len(self.elementBits)
+            mask |= 1 << self.elementBits[element]
+        return mask
+
+    def lookup(self, context, elements):
+        # True if known feasible, False if known infeasible, None if unknown
+        self.numLookups += 1
+        mask = self.toMask(elements)
+        for feasibleMask in self.feasibleSets.get(context, []):
+            if mask & ~feasibleMask == 0: # Subset of a feasible set
+                self.numSolvesSaved += 1
+                return True
+        for infeasibleMask in self.infeasibleSets.get(context, []):
+            if infeasibleMask & ~mask == 0: # Superset of an infeasible set
+                self.numSolvesSaved += 1
+                return False
+        return None
+
+    def record(self, context, elements, isFeasible):
+        # Add a solved set, dropping stored sets it makes redundant
+        mask = self.toMask(elements)
+        if isFeasible:
+            knownSets = [m for m in self.feasibleSets.get(context, []) if m & ~mask != 0] # Drop subsets of the new set
+            self.feasibleSets[context] = knownSets + [mask]
+        else:
+            knownSets = [m for m in self.infeasibleSets.get(context, []) if mask & ~m != 0] # Drop supersets of the new set
+            self.infeasibleSets[context] = knownSets + [mask]
+
+    def check(self, context, elements, solve):
+        # Look the set up; if unknown, call solve() and record its result
+        isFeasible = self.lookup(context, elements)
+        if isFeasible is None:
+            isFeasible = solve()
+            self.record(context, elements, isFeasible)
+        return isFeasible
+
+    def stats(self):
+        numFeasible = sum(len(sets) for sets in self.feasibleSets.values())
+        numInfeasible = sum(len(sets) for sets in self.infeasibleSets.values())
+        return "Feasibility index: " + str(self.numSolvesSaved) + " of " + str(self.numLookups) + \
+               " CP solves saved (" + str(numFeasible) + " feasible and " + str(numInfeasible) + " infeasible sets stored)"
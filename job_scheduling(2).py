@@ -1,6 +1,10 @@
 # -*- coding: utf-8 -*-
 """
 Simple CP problem that schedules jobs on a machine, ensuring available resources aren't overused 
+Set formulation to choose the model: integer TIME and RESOURCE variables with a disjunction for
+every pair of jobs, or interval variables with an optional interval for each job on each machine
+and no_overlap on each machine.  (A single cumulative constraint, as in scheduling_subproblem(1).py,
+can't express that jobs 5 and 6 use different resources, so it isn't offered here.)
 
 Requirements: 
  - CPLEX (or other Pyomo-compatible solver)
@@ -8,6 +12,7 @@ Requirements:
 
 # Import 
 from docplex.cp.model import CpoModel
+from docplex.cp.modeler import alternative, end_of, no_overlap, presence_of, start_of
 from docplex.cp.solution import CpoRefineConflictResult
 from sys import stdout
 
@@ -16,42 +21,70 @@ numJobs = 10 # Number of jobs
 totalTime = 15 # Total time blocks
 availResources = 2 # Total amount of resource available for this machine.  Assume each job uses one resource
 jobLength = [1,2,3,4,5,1,1,2,2,2] # The length (in time blocks) of each job
+formulation = 'pairwise' # 'pairwise' (integer TIME/RESOURCE variables) or 'machines' (interval variables, no_overlap on each machine)
 
 # Create a CPO model
 model = CpoModel()
 
-# Create variables
-TIME = model.integer_var_list(numJobs, 0, totalTime - 1, "TIME") # For each job, indicate start time
-RESOURCE = model.integer_var_list(numJobs, 0, availResources - 1, "RESOURCE") # For each job, indicate resource used
+if formulation == 'pairwise':
+    # Create variables
+    TIME = model.integer_var_list(numJobs, 0, totalTime - 1, "TIME") # For each job, indicate start time
+    RESOURCE = model.integer_var_list(numJobs, 0, availResources - 1, "RESOURCE") # For each job, indicate resource used
 
-# Add general constraints
-for i in range(numJobs):
-    # Jobs must end before the end of the totalTime available
-    model.add(TIME[i] + jobLength[i] <= totalTime) 
-    # Jobs can't be scheduled on a machine at the same time
+    # Add general constraints
+    for i in range(numJobs):
+        # Jobs must end before the end of the totalTime available
+        model.add(TIME[i] + jobLength[i] <= totalTime) 
+        # Jobs can't be scheduled on a machine at the same time
+        for j in range(numJobs):
+            if i != j:
+                model.add( (RESOURCE[i] != RESOURCE[j]) | (TIME[i] + jobLength[i] <= TIME[j]) | (TIME[j] + jobLength[j] <= TIME[i]) ) 
+
+    # Add specific constraints
+    model.add(TIME[3] < TIME[2]) # Job 4 must start before job 3
+    model.add(model.min(TIME[j] for j in range(numJobs)) == 0) # The first job must start at time 0
+    model.add(RESOURCE[4] != RESOURCE[5]) # Jobs 5 and 6 must use different resources
+
+    END = [TIME[j] + jobLength[j] for j in range(numJobs)] # End time of each job
+else:
+    # Create variables: each job runs for its length within the totalTime available, on one machine
+    JOB = [model.interval_var(start=(0, totalTime), end=(0, totalTime), size=jobLength[j], name="JOB_" + str(j)) for j in range(numJobs)]
+    MACHINE = [[model.interval_var(optional=True, name="MACHINE_" + str(j) + "_" + str(r)) for r in range(availResources)] for j in range(numJobs)]
+
+    # Add general constraints
     for j in range(numJobs):
-        if i != j:
-            model.add( (RESOURCE[i] != RESOURCE[j]) | (TIME[i] + jobLength[i] <= TIME[j]) | (TIME[j] + jobLength[j] <= TIME[i]) ) 
+        model.add(alternative(JOB[j], MACHINE[j])) # Each job uses one machine
+    for r in range(availResources):
+        model.add(no_overlap([MACHINE[j][r] for j in range(numJobs)])) # Jobs can't be scheduled on a machine at the same time
+
+    # Add specific constraints
+    model.add(start_of(JOB[3]) < start_of(JOB[2])) # Job 4 must start before job 3
+    model.add(model.min(start_of(JOB[j]) for j in range(numJobs)) == 0) # The first job must start at time 0
+    for r in range(availResources):
+        model.add(presence_of(MACHINE[4][r]) + presence_of(MACHINE[5][r]) <= 1) # Jobs 5 and 6 must use different resources
 
-# Add specific constraints
-model.add(TIME[3] < TIME[2]) # Job 4 must start before job 3
-model.add(model.min(TIME[j] for j in range(numJobs)) == 0) # The first job must start at time 0
-model.add(RESOURCE[4] != RESOURCE[5]) # Jobs 5 and 6 must use different resources
+    END = [end_of(JOB[j]) for j in range(numJobs)] # End time of each job
 
 # Add objective function to end as early as possible 
 # This line is optional; without it, this is the original constraint satisfaction problem.
 # May require more than 10 seconds of runtime.
-model.add(model.minimize(model.max(TIME[j] + jobLength[j] for j in range(numJobs))))
+model.add(model.minimize(model.max(END[j] for j in range(numJobs))))
 
 # Solve model
 print("Solving model....")
 msol = model.solve(TimeLimit=100)
 
 if msol: # If the model ran successfully, it returns True 
+    if formulation == 'pairwise':
+        startTimes = [msol[TIME[j]] for j in range(numJobs)]
+        machines = [msol[RESOURCE[j]] for j in range(numJobs)]
+    else:
+        startTimes = [msol.get_var_solution(JOB[j]).get_start() for j in range(numJobs)]
+        machines = [next(r for r in range(availResources) if msol.get_var_solution(MACHINE[j][r]).is_present()) for j in range(numJobs)]
     print("Solution:")
     for j in range(numJobs):
-        print("Job " + str(j) + " starts at time " + str(msol[TIME[j]]) + " and uses resource " + str(msol[RESOURCE[j]]))
-    print("Last job time ends at " + str(max(msol[TIME[j]] + jobLength[j] for j in range(numJobs))) )
+        print("Job " + str(j) + " starts at time " + str(startTimes[j]) + " and uses resource " + str(machines[j]))
+    print("Last job time ends at " + str(max(startTimes[j] + jobLength[j] for j in range(numJobs))) )
 else: # Problem is infeasible; print the infeasibility 
    theConflictsResult = model.refine_conflict()
    print(theConflictsResult)
@@ -6,6 +6,13 @@ Network flow problem aims to minimize costs of sending specific jobs to sites.
 At each site, must check feasibility of processing those jobs.
 Uses lazy constraint callback.  
 
+Two network formulations, selected by the formulation parameter:
+ - 'jobs': the original model, with a binary FLOW variable for each job on each arc
+ - 'aggregated': costs don't depend on the job, so jobs from the same supply node are
+   interchangeable on the network.  An integer FLOW variable for each supply node on each arc
+   carries all of its jobs, and a binary ASSIGN variable for each job and worksite its supply
+   node can reach says which of the jobs arriving at a worksite are which.  Cuts go on ASSIGN.
+
 Requirements: 
  - CPLEX (or other Pyomo-compatible solver)
 """
@@ -17,11 +24,13 @@ from pyomo.core import *
 import cplex
 from cplex.callbacks import LazyConstraintCallback
 
-import pandas as pd # For importing data from csv files
 import os
 import sys
 
-from scheduling_subproblem import *
+from feasibility_index import MonotoneFeasibilityIndex, schedulingElements # For answering subsets/supersets of known results
+from subproblem_pool import SubproblemPool # For solving the scheduling subproblems of all worksites in parallel
+from scheduling_check import ParallelMachineCheck, searchSchedule # For checking schedules as bin packing, without the CP model
+from shipping_network import aggregateArcs, buildArcIndexes, loadInstance, pruneArcs # For loading the network, dropping arcs no job can use, and giving each constraint only the arcs it sums over
 
 os.chdir(sys.path[0]) # This changes the working directory to directory of this .py file 
 
@@ -33,66 +42,44 @@ totalTime = 0
 numMachines = {}
 jobLengths = {}
 arcs = []
-
-def importData(supplyDataFileName, worksiteFileName, jobDataFileName, costDataFileName, capacityDataFileName, numNodes):
-    # Import data using pandas and return a list containing the data in separate objects 
+outArcs = {} # Arcs leaving each node, for each job: (i,k):[(i,j,k), ...]
+inArcs = {} # Arcs entering each node, for each job: (j,k):[(i,j,k), ...]
+pairArcs = {} # Arcs between each pair of nodes, for all jobs: (i,j):[(i,j,k), ...]
+worksiteArcs = {} # Arcs bringing each job into a worksite: k:[(i,j,k), ...]
+assignmentVariables = [] # Each way a job can be assigned to a worksite, for the callback: (worksite, job, variable name)
+feasibilityIndex = MonotoneFeasibilityIndex() # Known feasible/infeasible sets of job lengths, by machines and time available
+subproblemPool = None # Worker processes for solving the worksites' scheduling subproblems in parallel
+schedulingCheck = ParallelMachineCheck() # Bounds, LPT heuristic and cache of exact results for the scheduling subproblem
+
+def importData(supplyDataFileName, worksiteFileName, jobDataFileName, costDataFileName, capacityDataFileName, numNodes, cacheDir=None, prune=True, incumbentCost=None):
+    # Import data and return a list containing the data in separate objects.
+    # The CSVs are parsed with NumPy masks, and the parsed instance is cached (as a .npz file in cacheDir,
+    # default the data folder) so later runs with the same files skip the CSVs.
+    # If capacityDataFileName is None, costDataFileName is an edge list (columns from,to,cost,capacity), read in chunks.
+    # If prune, arcs a job can't use on its way from its supply node to a worksite are dropped, as are arcs
+    # that can only be in solutions costing more than incumbentCost (if given).
     print("Reading input data...")
-    transshipmentNodes = [*range(1,numNodes+1)] 
-
-    # Supply data (number of jobs at each node)
-    theDataFrame = pd.read_csv(supplyDataFileName, header=None) # Use pandas to read the csv 
-    numJobs = 1
-    supply = {} # For each node, a list of the jobs that come from that site 
-    supplyNodes = []
-    supplyJobArcs = [] # Arcs between each supply node and its associated jobs
-    for i in range(numNodes): # Iterate through each row
-        if theDataFrame.values[i] > 0: 
-            transshipmentNodes.remove(i+1) # Mark as not a transshipment node
-            supplyNodes.append(i+1)
-            supply[i+1] = [*range(numJobs, numJobs + int(theDataFrame.values[i]))] # Otherwise, this will return an numpy array
-            for k in range(numJobs, numJobs + int(theDataFrame.values[i])):
-                supplyJobArcs.append((i+1, k))
-            numJobs += int(theDataFrame.values[i])
-    numJobs -= 1 # To adjust at end 
-
-    # Worksite data (0 for non-worksites; number of machines for each worksite)
-    theDataFrame = pd.read_csv(worksiteFileName, header=None) # Use pandas to read the csv 
     global numMachines
-    numMachines = {} # Number of machines at each worksite
-    worksiteNodes = []
-    for i in range(numNodes): # Iterate through each row
-        if theDataFrame.values[i] > 0: 
-            transshipmentNodes.remove(i+1) # Mark as not a transshipment node
-            worksiteNodes.append(i+1)
-            numMachines[i+1] = float(theDataFrame.values[i])
-
-    # Job data, indicating length of job
-    theDataFrame = pd.read_csv(jobDataFileName, header=None) # Use pandas to read the csv 
     global jobLengths
-    jobLengths = {} 
-    for i in range(numJobs): # Iterate through each row
-        if theDataFrame.values[i] > 0: 
-            jobLengths[i+1] = float(theDataFrame.values[i])
+    global arcs
+    supplyNodes, supplyJobArcs, worksiteNodes, transshipmentNodes, numJobs, supply, numMachines, jobLengths, costs, capacities, arcs = \
+        loadInstance(supplyDataFileName, worksiteFileName, jobDataFileName, costDataFileName, capacityDataFileName, numNodes, cacheDir)
 
     numTransshipmentNodes = len(transshipmentNodes)
     if numNodes != len(supplyNodes) + len(worksiteNodes) + numTransshipmentNodes:
         print("ERROR: The number of nodes does not sum as expected.")
 
-    # Cost and arc capacity data
-    theDataFrameCost = pd.read_csv(costDataFileName, header=None) # Use pandas to read the csv 
-    theDataFrameCapacity = pd.read_csv(capacityDataFileName, header=None) 
-    costs = {} 
-    capacities = {}     
-    global arcs
-    for i in range(numNodes): # Iterate through each row and column.  
-        for j in range(numNodes): 
-            if i != j and theDataFrameCost.values[i,j] >= 0 and theDataFrameCapacity.values[i,j] > 0:
-                costs[i+1,j+1] = float(theDataFrameCost.values[i,j])
-                capacities[i+1,j+1] = float(theDataFrameCapacity.values[i,j])
-                if i+1 in supply: # If this is a supply node
-                    for k in supply[i+1]: arcs.append((i+1,j+1,k)) # Add index for jobs associated with this supply node
-                else: # Not a supply node; add arcs for all jobs 
-                    for k in range(1, numJobs+1): arcs.append((i+1,j+1,k)) # Add index for jobs 
+    if prune:
+        numArcs = len(arcs)
+        arcs = pruneArcs(arcs, costs, supply, worksiteNodes, transshipmentNodes, incumbentCost)
+        print("Pruning kept " + str(len(arcs)) + " of " + str(numArcs) + " arcs.")
+
+    # Index the arcs once, so each constraint only visits its own arcs
+    global outArcs
+    global inArcs
+    global pairArcs
+    global worksiteArcs
+    outArcs, inArcs, pairArcs, worksiteArcs = buildArcIndexes(arcs, worksiteNodes)
 
     print("Input data read successfully.")
     return [supplyNodes, supplyJobArcs, worksiteNodes, transshipmentNodes, numJobs, supply, numMachines, jobLengths, costs, capacities, arcs]
@@ -103,22 +90,40 @@ def objective_rule(model):
 
 def arcCapacity_rule(model,i,j):
     # Constraint on arc capacity 
-    if (i,j) not in model.capacities: # If this isn't an arc, skip it
+    if (i,j) not in model.capacities or (i,j) not in pairArcs: # If this isn't an arc, skip it
         return Constraint.Skip
     else:
-        return sum(model.FLOW[m,n,k] for (m,n,k) in model.arcs if m== i if n==j) <= model.capacities[i,j]
+        return sum(model.FLOW[m,n,k] for (m,n,k) in pairArcs[i,j]) <= model.capacities[i,j]
 
 def eachJobOut_rule(model,i,k):
     # Jobs must come out of each customer (supply) site
-    return sum(model.FLOW[m,j,t] for (m,j,t) in model.arcs if m == i if t == k) == 1
+    return sum(model.FLOW[m,j,t] for (m,j,t) in outArcs.get((i,k), [])) == 1
 
 def eachJobIn_rule(model,k):
     # Each job must go to a worksite
-    return sum(model.FLOW[i,j,t] for (i,j,t) in model.arcs if j in model.worksiteNodes if t == k) == 1
+    return sum(model.FLOW[i,j,t] for (i,j,t) in worksiteArcs.get(k, [])) == 1
+
+def commodityBounds_rule(model,i,j,s):
+    # Flow of a supply node's jobs on an arc is at most the number of jobs there
+    return (0, len(model.supply[s]))
+
+def commodityOut_rule(model,s):
+    # All of a supply node's jobs must come out of it
+    return sum(model.FLOW[m,j,t] for (m,j,t) in outArcs.get((s,s), [])) == len(model.supply[s])
+
+def commodityIn_rule(model,w,s):
+    # The jobs from supply node s assigned to worksite w are the ones that arrive there
+    return sum(model.FLOW[i,j,t] for (i,j,t) in inArcs[w,s]) == sum(model.ASSIGN[w,k] for k in model.supply[s] if (w,k) in model.assignments)
+
+def eachJobAssigned_rule(model,k):
+    # Each job must be assigned to a worksite
+    return sum(model.ASSIGN[w,k] for w in model.worksiteNodes if (w,k) in model.assignments) == 1
 
 def bof_rule(model,i,k):
     # Balance-of-flow constraints on transshipment nodes
-    return sum(model.FLOW[m,j,t] for (m,j,t) in model.arcs if m==i if t==k) - sum(model.FLOW[j,m,t] for (j,m,t) in model.arcs if m==i if t==k) == 0
+    if (i,k) not in outArcs and (i,k) not in inArcs: # Job k has no arcs at this node (e.g. it can't reach it)
+        return Constraint.Skip
+    return sum(model.FLOW[m,j,t] for (m,j,t) in outArcs.get((i,k), [])) - sum(model.FLOW[j,m,t] for (j,m,t) in inArcs.get((i,k), [])) == 0
 
 class cplexLazyConstraintCallback(LazyConstraintCallback):
     # CPLEX lazy constraint callback (this is only enabled when solving using .lp file interface).
@@ -128,10 +133,13 @@ class cplexLazyConstraintCallback(LazyConstraintCallback):
         
         # Reference global values (otherwise, can't access these data inside this callback code)
         global numNodes
-        global arcs
+        global assignmentVariables
         global totalTime
         global numMachines # Dict of number of machines at each worksite
         global jobLengths
+        global feasibilityIndex
+        global subproblemPool
+        global schedulingCheck
 
         # Create data structure to hold jobs assigned
         jobAssigned = {}
@@ -140,15 +148,19 @@ class cplexLazyConstraintCallback(LazyConstraintCallback):
             jobAssigned[worksite] = [] 
             tempVariableDict[worksite] = [] 
 
-        # Record assigned jobs, by looping over all flow arcs, where j = a worksite.  
-        for i,j,k in arcs:
-            if j in numMachines: # If this is a worksite
-                if self.get_values('FLOW(' + str(i) + '_' + str(j) + '_' + str(k) + ')') == 1: # If this arc is bringing in a job 
-                    jobAssigned[j].append(k)
-                    tempVariableDict[j].append(('FLOW(' + str(i) + '_' + str(j) + '_' + str(k) + ')'))
-
-        # Loop through each worksite and check feasibilty.
-        # If infeasible, add a constraint preventing all of these jobs from being assigned to this node
+        # Record assigned jobs, by looping over the variables that assign jobs to worksites
+        # (flow arcs into worksites, or ASSIGN variables in the aggregated formulation)
+        for worksite, job, variableName in assignmentVariables:
+            if self.get_values(variableName) > 0.5: # If this variable is bringing in a job 
+                jobAssigned[worksite].append(job)
+                tempVariableDict[worksite].append(variableName)
+
+        # Check feasibility at each worksite, using known results where possible.
+        # Fewer jobs than a feasible set are feasible, and more jobs than an infeasible set are infeasible.
+        # The remaining scheduling problems are searched in parallel.
+        isFeasible = {}
+        pending = {} # (context, elements): worksites needing a solve with these machines, time and job lengths (solved once)
+        tasks = []
         for worksite in numMachines:
             numJobs = len(jobAssigned[worksite]) # Number of jobs
             if numJobs > 0:
@@ -156,23 +168,69 @@ class cplexLazyConstraintCallback(LazyConstraintCallback):
                 theseJobLengths = []
                 for job in jobAssigned[worksite]:
                     theseJobLengths.append(jobLengths[job])
-
-                isFeasible = solveSchedulingSubproblem(numJobs, totalTime, availResources, theseJobLengths)
-                if not isFeasible: # Scheduling problem was infeasible; add cut
-                    print("Infeasible assignment at worksite " + str(worksite) + "; adding cut...")
-                    variableList = tempVariableDict[worksite] # Create list of string names of the active variables
-                    coefficientList = [1] * len(variableList) # Create list of the coefficients 
-                    self.add([variableList,coefficientList], "L", len(variableList)-1) # Add a cut that says at least one of these jobs can't get done
-                    print("The variableList is " + str(variableList))
-                else:
-                    print("Feasible assignment of jobs to machines at worksite " + str(worksite))
+                context, elements = schedulingElements(totalTime, availResources, theseJobLengths)
+                isFeasible[worksite] = feasibilityIndex.lookup(context, elements)
+                if isFeasible[worksite] is None: # Bounds, LPT heuristic and cache
+                    isFeasible[worksite] = schedulingCheck.quickCheck(numJobs, totalTime, availResources, theseJobLengths)
+                    if isFeasible[worksite] is not None:
+                        feasibilityIndex.record(context, elements, isFeasible[worksite])
+                if isFeasible[worksite] is None:
+                    key = (context, tuple(elements))
+                    if key not in pending:
+                        pending[key] = []
+                        tasks.append([(theseJobLengths, availResources, totalTime), {}])
+                    pending[key].append(worksite)
+        solutions = subproblemPool.solveAll(searchSchedule, tasks)
+        for (context, elements), task, (solution, timedOut) in zip(pending, tasks, solutions):
+            theseJobLengths, availResources, theTotalTime = task[0]
+            if timedOut: # Not proven infeasible, so don't keep it (the assignment is still cut, as without a result)
+                print("Time limit reached; treating schedule as infeasible.")
+            else:
+                schedulingCheck.recordSearch(theTotalTime, availResources, theseJobLengths, solution)
+                feasibilityIndex.record(context, elements, solution)
+            for worksite in pending[(context, elements)]:
+                isFeasible[worksite] = solution
+
+        # Add all cuts in one pass: if infeasible, add a constraint preventing all of these jobs from being assigned to this node
+        for worksite in isFeasible:
+            if not isFeasible[worksite]: # Scheduling problem was infeasible; add cut
+                print("Infeasible assignment at worksite " + str(worksite) + "; adding cut...")
+                variableList = tempVariableDict[worksite] # Create list of string names of the active variables
+                coefficientList = [1] * len(variableList) # Create list of the coefficients 
+                self.add([variableList,coefficientList], "L", len(variableList)-1) # Add a cut that says at least one of these jobs can't get done
+                print("The variableList is " + str(variableList))
+            else:
+                print("Feasible assignment of jobs to machines at worksite " + str(worksite))
             
-def solveUsingPyomoCPLEX_LP(supplyDataFileName, worksiteFileName, costDataFileName, capacityDataFileName, jobDataFileName, numNodes, totalTime):
-    ''' Create and solve a concrete Pyomo model and CPLEX interface (to allow lazy constraint callbacks) '''
+def solveUsingPyomoCPLEX_LP(supplyDataFileName, worksiteFileName, costDataFileName, capacityDataFileName, jobDataFileName, numNodes, totalTime, numWorkers=None, incumbentCost=None, formulation='jobs'):
+    ''' Create and solve a concrete Pyomo model and CPLEX interface (to allow lazy constraint callbacks) 
+    numWorkers: Number of worker processes for scheduling subproblems (int; default: one per CPU)
+    incumbentCost: Cost of a known feasible solution, for dropping arcs only in costlier solutions (float; default: none)
+    formulation: 'jobs' (flow for each job) or 'aggregated' (flow for each supply node's jobs together) (str)
+    '''
+    global outArcs
+    global inArcs
+    global pairArcs
+    global worksiteArcs
+    global assignmentVariables
+    if formulation not in ['jobs', 'aggregated']:
+        print("ERROR: Unknown formulation " + str(formulation) + "; use 'jobs' or 'aggregated'.")
+        return
+    global subproblemPool
+    subproblemPool = SubproblemPool(numWorkers) # Started before CPLEX, and kept for the whole solve
 
     # Read in data
     supplyNodes, supplyJobArcs, worksiteNodes, transshipmentNodes, numJobs, supply, numMachines, jobLengths, costs, capacities, arcs = \
-        importData(supplyDataFileName, worksiteFileName, jobDataFileName, costDataFileName, capacityDataFileName, numNodes) 
+        importData(supplyDataFileName, worksiteFileName, jobDataFileName, costDataFileName, capacityDataFileName, numNodes, incumbentCost=incumbentCost) 
+    if formulation == 'aggregated':
+        # Arcs (i,j,s) for the jobs of supply node s, indexed the same way as the job arcs (with s in place of k)
+        arcs = aggregateArcs(arcs, supply)
+        outArcs, inArcs, pairArcs, worksiteArcs = buildArcIndexes(arcs, worksiteNodes)
+        assignments = [(j,k) for s in supply for j in dict.fromkeys(j for (i,j,t) in worksiteArcs.get(s, [])) for k in supply[s]]
+        assignmentVariables = [(j, k, 'ASSIGN(' + str(j) + '_' + str(k) + ')') for (j,k) in assignments]
+    else:
+        assignmentVariables = [(j, k, 'FLOW(' + str(i) + '_' + str(j) + '_' + str(k) + ')') for jobArcs in worksiteArcs.values() for (i,j,k) in jobArcs]
+    print(str(len(arcs)) + " flow variables" + (" and " + str(len(assignmentVariables)) + " assignment variables" if formulation == 'aggregated' else "") + ".")
 
     # Create a concrete Pyomo model
     print("Building Pyomo model...")
@@ -185,13 +243,14 @@ def solveUsingPyomoCPLEX_LP(supplyDataFileName, worksiteFileName, costDataFileNa
     model.supplyNodes = Set(within=model.i, initialize = supplyNodes) # Index on each supply node (customer site)
     model.worksiteNodes = Set(within=model.i, initialize = worksiteNodes) # Index on each worksite node
     model.transshipmentNodes = Set(within=model.i, initialize = transshipmentNodes) # Index on each transshipment node
-    model.arcs = Set(within=model.i * model.i * model.k, initialize = arcs) # Create the set of arcs
     model.supplyJobArcs = Set(within=model.i * model.k, initialize=supplyJobArcs) # Arcs between each supply node and its jobs
+    if formulation == 'aggregated':
+        model.arcs = Set(within=model.i * model.i * model.supplyNodes, initialize = arcs) # Create the set of arcs, for each supply node's jobs
+        model.assignments = Set(within=model.worksiteNodes * model.k, initialize = assignments) # Worksites each job can be assigned to
+        model.worksiteCommodities = Set(within=model.worksiteNodes * model.supplyNodes, initialize = [(j,s) for (j,s) in inArcs if j in numMachines]) # Supply nodes whose jobs can reach each worksite
+    else:
+        model.arcs = Set(within=model.i * model.i * model.k, initialize = arcs) # Create the set of arcs
 
-    # # Define variables
-    print("Creating variables...")
-    model.FLOW = Var(model.arcs, domain=Binary, initialize = 0) # Flow variable, indicating arc i,j for job k
-    
     # Create parameters (i.e., data)
     print("Creating parameters...")
     model.supply = Param(model.supplyNodes, initialize = supply) # For each customer node, a list of the jobs that come from that site 
@@ -199,6 +258,14 @@ def solveUsingPyomoCPLEX_LP(supplyDataFileName, worksiteFileName, costDataFileNa
     model.costs = Param(model.i * model.i, initialize = costs) # Assumes costs for each job are the same
     model.capacities = Param(model.i * model.i, initialize = capacities) # Total capacity on arc, across all jobs    
 
+    # # Define variables
+    print("Creating variables...")
+    if formulation == 'aggregated':
+        model.FLOW = Var(model.arcs, domain=NonNegativeIntegers, bounds=commodityBounds_rule, initialize = 0) # Flow variable, indicating how many of supply node s's jobs use arc i,j
+        model.ASSIGN = Var(model.assignments, domain=Binary, initialize = 0) # Assignment variable, indicating job k is done at worksite w
+    else:
+        model.FLOW = Var(model.arcs, domain=Binary, initialize = 0) # Flow variable, indicating arc i,j for job k
+    
      # Create objective function
     print("Creating objective function...")
     model.objective = Objective(rule=objective_rule, sense = minimize)
@@ -207,11 +274,16 @@ def solveUsingPyomoCPLEX_LP(supplyDataFileName, worksiteFileName, costDataFileNa
     model.arcCapacityConstraint = Constraint(model.i, model.i, rule=arcCapacity_rule) 
 
     print("Creating constraints ensuring each job gets done...")
-    model.jobOutConstraint = Constraint(model.supplyJobArcs, rule=eachJobOut_rule)
-    model.jobInConstraint = Constraint(model.k, rule=eachJobIn_rule)
+    if formulation == 'aggregated':
+        model.jobOutConstraint = Constraint(model.supplyNodes, rule=commodityOut_rule)
+        model.jobInConstraint = Constraint(model.worksiteCommodities, rule=commodityIn_rule)
+        model.jobAssignedConstraint = Constraint(model.k, rule=eachJobAssigned_rule)
+    else:
+        model.jobOutConstraint = Constraint(model.supplyJobArcs, rule=eachJobOut_rule)
+        model.jobInConstraint = Constraint(model.k, rule=eachJobIn_rule)
 
     print("Creating balance-of-flow constraints...")
-    model.bofConstraint = Constraint(model.transshipmentNodes, model.k, rule=bof_rule) 
+    model.bofConstraint = Constraint(model.transshipmentNodes, model.supplyNodes if formulation == 'aggregated' else model.k, rule=bof_rule) 
 
     print("Pyomo model created.  Saving as LP file and setting up CPLEX interface...")
     model.write('pyomoModel.lp', io_options={'symbolic_solver_labels':True}) # Write Pyomo model as an LP file
@@ -227,34 +299,49 @@ def solveUsingPyomoCPLEX_LP(supplyDataFileName, worksiteFileName, costDataFileNa
 
     # Print results (this is hard-coded to be specific to this problem)
     print("The objective value is: " + str(results.get_objective_value()))
+    print(feasibilityIndex.stats())
+    print(schedulingCheck.stats())
+    print(subproblemPool.stats())
+    subproblemPool.close()
     amountSent = [0] * numNodes
     amountReceived = [0] * numNodes
     for i,j,k in model.arcs:
         theFlow = results.get_values("FLOW(" + str(i) + "_" + str(j) + "_" + str(k)+ ")") 
         if(theFlow) > 0: # If there is flow on this arc
-            print("Job " + str(k) + " went from node " + str(i) + " to node " +str(j))
+            if formulation == 'aggregated':
+                print(str(round(theFlow)) + " jobs from node " + str(k) + " went from node " + str(i) + " to node " + str(j))
+            else:
+                print("Job " + str(k) + " went from node " + str(i) + " to node " +str(j))
             amountSent[i-1] += theFlow
             amountReceived[j-1] += theFlow
     for i in model.supplyNodes: print("Node " +str(i) + " sent " + str(amountSent[i-1] - amountReceived[i-1]) + " jobs.")
     for i in model.worksiteNodes: print("Node " +str(i) + " received " + str(amountReceived[i-1] - amountSent[i-1]) + " jobs.")
-
-#### Specify data files and run above code
-## Small Dataset
-supplyDataFileName = "data/supplyDataSmall.csv" # Total number of jobs that come out of each customer site
-worksiteFileName = "data/worksiteDataSmall.csv" # Number of machines, at each worksite
-costDataFileName = "data/costDataSmall.csv" # Per-unit shipping costs on each arc, for each job 
-capacityDataFileName = "data/capacityDataSmall.csv" # Total arc capacities (over all jobs)
-jobDataFileName = "data/jobDataSmall.csv" 
-numNodes = 12
-totalTime = 6 # For small dataset, 4 seems to be lower bound 
-
-## Medium Dataset
-# supplyDataFileName = "data/supplyDataMedium.csv" # Total number of jobs that come out of each customer site
-# worksiteFileName = "data/worksiteDataMedium.csv" # Number of machines, at each worksite
-# costDataFileName = "data/costDataMedium.csv" # Per-unit shipping costs on each arc, for each job 
-# capacityDataFileName = "data/capacityDataMedium.csv" # Total arc capacities (over all jobs)
-# jobDataFileName = "data/jobDataMedium.csv" 
-# numNodes = 100
-# totalTime = 9 #9 seems to be infeasible (5000 sec, 27 user cuts). 10 worked 17 user cuts, 3887 secs; 12 worked, 17 user cuts, 2058 seconds
-
-solveUsingPyomoCPLEX_LP(supplyDataFileName, worksiteFileName, costDataFileName, capacityDataFileName, jobDataFileName, numNodes, totalTime) # Run above code 
\ No newline at end of file
+    if formulation == 'aggregated':
+        for worksite, job, variableName in assignmentVariables:
+            if results.get_values(variableName) > 0.5: print("Job " + str(job) + " is done at worksite " + str(worksite))
+
+if __name__ == "__main__": # Only when run directly, not when worker processes import this file
+    #### Specify data files and run above code
+    ## Small Dataset
+    supplyDataFileName = "data/supplyDataSmall.csv" # Total number of jobs that come out of each customer site
+    worksiteFileName = "data/worksiteDataSmall.csv" # Number of machines, at each worksite
+    costDataFileName = "data/costDataSmall.csv" # Per-unit shipping costs on each arc, for each job 
+    capacityDataFileName = "data/capacityDataSmall.csv" # Total arc capacities (over all jobs)
+    jobDataFileName = "data/jobDataSmall.csv" 
+    numNodes = 12
+    totalTime = 6 # For small dataset, 4 seems to be lower bound 
+
+    ## Medium Dataset
+    # supplyDataFileName = "data/supplyDataMedium.csv" # Total number of jobs that come out of each customer site
+    # worksiteFileName = "data/worksiteDataMedium.csv" # Number of machines, at each worksite
+    # costDataFileName = "data/costDataMedium.csv" # Per-unit shipping costs on each arc, for each job 
+    # capacityDataFileName = "data/capacityDataMedium.csv" # Total arc capacities (over all jobs)
+    # jobDataFileName = "data/jobDataMedium.csv" 
+    # numNodes = 100
+    # totalTime = 9 #9 seems to be infeasible (5000 sec, 27 user cuts). 10 worked 17 user cuts, 3887 secs; 12 worked, 17 user cuts, 2058 seconds
+
+    ## Large, sparse networks: give the arcs as an edge list instead of dense cost and capacity matrices
+    # costDataFileName = "data/arcDataLarge.csv" # One row per arc: from,to,cost,capacity (with that header; nodes numbered from 1)
+    # capacityDataFileName = None # Capacities are in the edge list
+
+    solveUsingPyomoCPLEX_LP(supplyDataFileName, worksiteFileName, costDataFileName, capacityDataFileName, jobDataFileName, numNodes, totalTime) # Run above code 
\ No newline at end of file
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""
+Branch-and-bound solver for the 0-1 knapsack problem, for sacks with huge capacities
+and a moderate number of items, where the dynamic programming table is too big.
+Items are sorted by value/weight ratio, nodes are bounded with the fractional (Dantzig)
+LP relaxation, and the search starts from a greedy incumbent.
+
+Returns the same [sackContents, totalValue, totalWeight] as knapsack_01, so callers can
+switch solvers freely.
+"""
+# Import
+import numpy as np
+from time import perf_counter
+
+from knapsack_sparse import knapsack_01_sparse
+
+def knapsack_01_bnb(weights, values, capacity, nodeLimit=None, timeLimit=None):
+    ''' Input data
+    weights: weight of each item (list; weights[0] is item 1)
+    values: value of each item (list; values[0] is item 1)
+    capacity: size of the sack (int)
+    nodeLimit: maximum number of search nodes, or None for no limit (int)
+    timeLimit: maximum search time in seconds, or None for no limit (float)
+    Returns [sackContents, totalValue, totalWeight].  If a limit is reached, this is the best
+    solution found so far, which may not be optimal.
+    '''
+    startTime = perf_counter()
+    numItems = len(weights)
+    itemWeight = [0] + [int(w) for w in weights] # 0th item is placeholder, to allow one-based indexing
+    itemValue = [0] + [int(v) for v in values]
+
+    # Items with no weight are always worth taking; items that can't fit or add nothing are never taken
+    fixedContents = [i for i in range(1,numItems+1) if itemWeight[i] == 0 and itemValue[i] > 0]
+    candidates = [i for i in range(1,numItems+1) if 0 < itemWeight[i] <= capacity and itemValue[i] > 0]
+
+    # Sort by value/weight ratio, best first
+    candidates.sort(key=lambda i: itemValue[i] / itemWeight[i], reverse=True)
+    sortedWeight = np.array([itemWeight[i] for i in candidates], dtype=np.int64)
+    sortedValue = np.array([itemValue[i] for i in candidates], dtype=np.int64)
+    prefixWeight = np.concatenate(([0], np.cumsum(sortedWeight))) # Weight of the first j sorted items
+    prefixValue = np.concatenate(([0], np.cumsum(sortedValue)))
+    numCandidates = len(candidates)
+
+    def upperBound(j, remaining):
+        # Dantzig bound: fill the remaining space with sorted items j, j+1, ... and a fraction of the first that doesn't fit
+        s = np.searchsorted(prefixWeight, prefixWeight[j] + remaining, side='right') - 1 # Items j..s-1 fit whole
+        bound = prefixValue[s] - prefixValue[j]
+        if s < numCandidates:
+            bound += (remaining - (prefixWeight[s] - prefixWeight[j])) * sortedValue[s] // sortedWeight[s]
+        return bound
+
+    # Greedy incumbent: take sorted items while they fit, or the single best item if that is better
+    bestValue = 0
+    bestChosen = None # Linked list (position, rest) of positions in the sorted order
+    remaining = capacity
+    for j in range(numCandidates):
+        if sortedWeight[j] <= remaining:
+            remaining -= sortedWeight[j]
+            bestValue += int(sortedValue[j])
+            bestChosen = (j, bestChosen)
+    if numCandidates > 0 and int(sortedValue.max()) > bestValue:
+        bestValue = int(sortedValue.max())
+        bestChosen = (int(sortedValue.argmax()), None)
+
+    # Depth-first search, trying to take each item before skipping it
+    numNodes = 0
+    limitReached = False
+    stack = [(0, capacity, 0, None)] # (next sorted position, remaining capacity, value so far, chosen positions)
+    while stack:
+        j, remaining, value, chosen = stack.pop()
+        numNodes += 1
+        if (nodeLimit is not None and numNodes > nodeLimit) or \
+           (timeLimit is not None and numNodes % 1000 == 0 and perf_counter() - startTime > timeLimit):
+            limitReached = True
+            break
+        if value > bestValue: # New incumbent
+            bestValue = value
+            bestChosen = chosen
+        if j == numCandidates or value + upperBound(j, remaining) <= bestValue: # Nothing better below this node
+            continue
+        stack.append((j+1, remaining, value, chosen)) # Skip item j
+        if sortedWeight[j] <= remaining: # Take item j (explored first)
+            stack.append((j+1, remaining - int(sortedWeight[j]), value + int(sortedValue[j]), (j, chosen)))
+
+    if limitReached:
+        print("Search limit reached after " + str(numNodes - 1) + " nodes; solution may not be optimal.")
+
+    # Convert chosen sorted positions back to item numbers
+    sackContents = list(fixedContents)
+    while bestChosen is not None:
+        sackContents.append(candidates[bestChosen[0]])
+        bestChosen = bestChosen[1]
+    sackContents.sort() # Sort smallest to largest
+
+    totalValue = sum(itemValue[i] for i in sackContents)
+    totalWeight = sum(itemWeight[i] for i in sackContents)
+    return [sackContents, totalValue, totalWeight]
+
+if __name__ == "__main__":
+    # Slide data, as in dp_knapsack_example (1).py
+    print(knapsack_01_bnb([2,3,4,5], [3,4,5,6], 5))
+    print("")
+
+    # Huge capacity, moderate number of items: compare with the sparse solver
+    rng = np.random.default_rng(1) # Set random seed
+    for numItems in [20, 40, 60]:
+        weights = rng.integers(10**8, 10**9, numItems).tolist()
+        values = rng.integers(1, 1000, numItems).tolist()
+        sackSize = sum(weights) // 2
+
+        startTime = perf_counter()
+        sparseResult = knapsack_01_sparse(weights, values, sackSize)
+        sparseTime = perf_counter() - startTime
+
+        startTime = perf_counter()
+        bnbResult = knapsack_01_bnb(weights, values, sackSize, timeLimit=60)
+        bnbTime = perf_counter() - startTime
+
+        if sparseResult[1] != bnbResult[1]:
+            print("ERROR: Branch-and-bound does not match the sparse solver.")
+        print("numItems = " + str(numItems) + ": sparse " + str(round(sparseTime, 4)) + " sec, branch-and-bound " +
+              str(round(bnbTime, 4)) + " sec, total value " + str(bnbResult[1]))
@@ -0,0 +1,308 @@
+# -*- coding: utf-8 -*-
+"""
+Reusable solver for the 0-1 knapsack problem using a dynamic programming approach.
+Same recursion as dp_knapsack_example (1).py, but each row of the value table is filled
+in one vectorized step over the whole capacity axis, instead of one cell at a time.
+Also solves the multidimensional version from multidimensional_knapsack_dp.py, for any number
+of resources, by updating a whole N-D item layer at once with shifted slices.
+
+Both solvers have a low-memory mode that keeps only the current value layer (plus one
+checkpoint layer per level of recursion) and rebuilds the selected items with a
+divide-and-conquer pass, instead of storing the full (numItems+1) x capacity table.
+For instances larger than RAM, the full table can instead be kept on disk with np.memmap.
+
+Run this file directly to benchmark it against the original loop on growing sack sizes.
+"""
+# Import
+import numpy as np
+import os
+import tempfile
+import tracemalloc
+from time import perf_counter
+
+memmapChunkBytes = 64 * 1024**2 # Size of the block of item layers computed in memory before writing to disk
+
+def valueDtype(maxTotalValue):
+    # Smallest integer type that can hold every entry of the value table
+    for dtype in [np.int16, np.int32]:
+        if maxTotalValue <= np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+def addItem(layer, demand, value):
+    ''' Update a value layer in place, so that it also allows selecting one more item
+    layer: best value for each remaining amount of every resource (numpy array, one axis per resource)
+    demand: amount of each resource the item uses (tuple, one entry per axis)
+    value: value of the item (int)
+    '''
+    if any(demand[d] >= layer.shape[d] for d in range(layer.ndim)): # Item can't fit anywhere in this layer
+        return
+    # The whole layer is updated at once: every cell that can fit the item is compared with the
+    # cell shifted back by the item's demand on every axis, plus the item's value.
+    fits = tuple(slice(demand[d], None) for d in range(layer.ndim))
+    shifted = tuple(slice(0, layer.shape[d] - demand[d]) for d in range(layer.ndim))
+    layer[fits] = np.maximum(layer[fits], layer[shifted] + value)
+
+def fullTableContents(demands, itemValue, capacities, scratchDir=None):
+    # Build the full value table, one layer per item, and backtrack through it.
+    # demands and itemValue use one-based indexing (0th item is placeholder).
+    # If scratchDir is given, the table is a memory-mapped file in that directory.
+    numItems = len(demands) - 1
+    layerShape = tuple(c+1 for c in capacities)
+    dtype = valueDtype(sum(abs(v) for v in itemValue))
+    if scratchDir is None:
+        valueTable = np.zeros((numItems+1,) + layerShape, dtype=dtype) # Create array of zeros
+        for i in range(1,numItems+1): # For each item
+            valueTable[i] = valueTable[i-1] # Carry forward previous solution without this item
+            addItem(valueTable[i], demands[i], itemValue[i])
+        return backtrackContents(valueTable, demands, capacities)
+
+    fileHandle, fileName = tempfile.mkstemp(suffix='.dat', dir=scratchDir)
+    os.close(fileHandle)
+    try:
+        valueTable = np.memmap(fileName, dtype=dtype, mode='w+', shape=(numItems+1,) + layerShape)
+        valueTable[0] = 0
+
+        # Compute item layers in memory, a block at a time, and write each block to disk in one go
+        layer = np.zeros(layerShape, dtype=dtype)
+        chunkSize = max(1, min(numItems, memmapChunkBytes // layer.nbytes))
+        chunk = np.empty((chunkSize,) + layerShape, dtype=dtype)
+        for start in range(1, numItems+1, chunkSize):
+            stop = min(start + chunkSize, numItems+1)
+            for i in range(start, stop):
+                addItem(layer, demands[i], itemValue[i])
+                chunk[i - start] = layer
+            valueTable[start:stop] = chunk[:stop - start]
+            valueTable.flush()
+        del chunk, layer
+
+        # Backtracking reads the file from the last layer to the first, one cell per layer
+        sackContents = backtrackContents(valueTable, demands, capacities)
+        del valueTable # Close the memory map before removing the file
+    finally:
+        os.remove(fileName)
+    return sackContents
+
+def backtrackContents(valueTable, demands, capacities):
+    # Obtain solution from table
+    k = tuple(capacities)
+    sackContents = [] # Items that are selected
+    for i in range(len(demands) - 1, 0, -1): # Zero-demand items can still be selected once k reaches 0
+        if valueTable[(i,) + k] != valueTable[(i-1,) + k]:
+            sackContents.append(i)
+            k = tuple(k[d] - demands[i][d] for d in range(len(k)))
+    return sackContents
+
+def lowMemoryContents(demands, itemValue, capacities):
+    # Same selection as fullTableContents, without storing the full value table
+    numItems = len(demands) - 1
+    sackContents = [] # Items that are selected
+    if numItems > 0:
+        firstLayer = np.zeros(tuple(c+1 for c in capacities), dtype=valueDtype(sum(abs(v) for v in itemValue)))
+        divideAndConquer(demands, itemValue, 0, numItems, firstLayer, tuple(capacities), sackContents)
+    return sackContents
+
+def divideAndConquer(demands, itemValue, lo, hi, loLayer, k, sackContents):
+    ''' Reconstruct the choice of items lo+1..hi, exactly as full-table backtracking would
+    loLayer: value layer using items 1..lo (numpy array, covering at least capacities 0..k)
+    k: remaining capacity when backtracking reaches item hi (tuple)
+    Appends selected items to sackContents, and returns the capacity left for items 1..lo.
+    '''
+    if hi - lo == 1: # Single item: compare the layers with and without it at k
+        demand = demands[hi]
+        if all(demand[d] <= k[d] for d in range(len(k))):
+            if itemValue[hi] + loLayer[tuple(k[d] - demand[d] for d in range(len(k)))] > loLayer[k]:
+                sackContents.append(hi)
+                return tuple(k[d] - demand[d] for d in range(len(k)))
+        return k
+
+    # Run forward to the midpoint, resolve the upper half first (backtracking goes top-down),
+    # then reuse the layer at lo for the lower half with whatever capacity is left.
+    mid = (lo + hi) // 2
+    midLayer = loLayer[tuple(slice(0, c+1) for c in k)].copy() # Only capacities up to k matter from here on
+    for i in range(lo+1, mid+1):
+        addItem(midLayer, demands[i], itemValue[i])
+    k = divideAndConquer(demands, itemValue, mid, hi, midLayer, k, sackContents)
+    del midLayer # Free before descending into the lower half
+    return divideAndConquer(demands, itemValue, lo, mid, loLayer, k, sackContents)
+
+def knapsack_01(weights, values, capacity, lowMemory=False, scratchDir=None):
+    ''' Input data
+    weights: weight of each item (list; weights[0] is item 1)
+    values: value of each item (list; values[0] is item 1)
+    capacity: size of the sack (int)
+    lowMemory: if True, don't store the full value table (bool)
+    scratchDir: if given, store the full value table in a memory-mapped file in this directory (str)
+    Returns [sackContents, totalValue, totalWeight], where sackContents is the sorted list of
+    selected items, numbered from 1 as in the example script.
+    '''
+    itemWeight = [0] + [int(w) for w in weights] # 0th item is placeholder, to allow one-based indexing
+    itemValue = [0] + [int(v) for v in values]
+    demands = [(w,) for w in itemWeight]
+
+    if lowMemory:
+        sackContents = lowMemoryContents(demands, itemValue, [capacity])
+    else:
+        sackContents = fullTableContents(demands, itemValue, [capacity], scratchDir)
+    sackContents.sort() # Sort smallest to largest
+
+    totalValue = sum(itemValue[i] for i in sackContents)
+    totalWeight = sum(itemWeight[i] for i in sackContents)
+    return [sackContents, totalValue, totalWeight]
+
+def knapsack_multidim(values, resources, capacities, lowMemory=False, scratchDir=None):
+    ''' Input data
+    values: value of each item (list; values[0] is item 1)
+    resources: amount of each resource used by each item, e.g. (money, weight, time) (list of tuples)
+    capacities: amount of each resource available (list)
+    lowMemory: if True, don't store the full value table (bool)
+    scratchDir: if given, store the full value table in a memory-mapped file in this directory (str)
+    Returns [sackContents, totalValue, totalResources], where totalResources is a list with
+    the total amount of each resource used.
+    '''
+    itemValue = [0] + [int(v) for v in values] # 0th item is placeholder, to allow one-based indexing
+    demands = [tuple(0 for c in capacities)] + [tuple(int(r) for r in item) for item in resources]
+
+    if lowMemory:
+        sackContents = lowMemoryContents(demands, itemValue, capacities)
+    else:
+        sackContents = fullTableContents(demands, itemValue, capacities, scratchDir)
+    sackContents.sort() # Sort smallest to largest
+
+    totalValue = sum(itemValue[i] for i in sackContents)
+    totalResources = [sum(demands[i][d] for i in sackContents) for d in range(len(capacities))]
+    return [sackContents, totalValue, totalResources]
+
+def knapsack01Loop(weights, values, capacity):
+    # Original cell-by-cell algorithm from dp_knapsack_example (1).py, kept for benchmarking
+    numItems = len(weights)
+    itemWeight = [0] + list(weights)
+    itemValue = [0] + list(values)
+    valueTable = np.zeros((numItems+1,capacity+1), dtype=np.int64)
+    for i in range(1,numItems+1):
+        for w in range(0,capacity+1):
+            if itemWeight[i] <= w and itemValue[i] + valueTable[i-1, w-itemWeight[i]] > valueTable[i-1,w]:
+                valueTable[i,w] = itemValue[i] + valueTable[i-1, w-itemWeight[i]]
+            else:
+                valueTable[i,w] = valueTable[i-1, w]
+    return int(valueTable[numItems, capacity])
+
+def multidimKnapsackLoop(values, resources, capacities):
+    # Original nested-loop algorithm from multidimensional_knapsack_dp.py, kept for benchmarking
+    numItems = len(values)
+    itemValue = [0] + list(values)
+    itemMoney = [0] + [r[0] for r in resources]
+    itemWeight = [0] + [r[1] for r in resources]
+    itemTime = [0] + [r[2] for r in resources]
+    sackSizeMoney, sackSizeWeight, sackSizeTime = capacities
+    valueTable = np.zeros((numItems+1,sackSizeMoney+1,sackSizeWeight+1,sackSizeTime+1), dtype=np.int64)
+    for i in range(1,numItems+1):
+        for w in range(0,sackSizeMoney+1):
+            for x in range(0,sackSizeWeight+1):
+                for y in range(0,sackSizeTime+1):
+                    if itemMoney[i] <= w and itemWeight[i] <= x and itemTime[i] <= y and \
+                       itemValue[i] + valueTable[i-1, w-itemMoney[i], x-itemWeight[i], y-itemTime[i]] > valueTable[i-1,w,x,y]:
+                        valueTable[i,w,x,y] = itemValue[i] + valueTable[i-1, w-itemMoney[i], x-itemWeight[i], y-itemTime[i]]
+                    else:
+                        valueTable[i,w,x,y] = valueTable[i-1,w,x,y]
+    return int(valueTable[numItems, sackSizeMoney, sackSizeWeight, sackSizeTime])
+
+if __name__ == "__main__":
+    # Slide data, as in dp_knapsack_example (1).py
+    sackContents, totalValue, totalWeight = knapsack_01([2,3,4,5], [3,4,5,6], 5)
+    print("The selected items are: ")
+    print(sackContents)
+    print("Total value: " + str(totalValue))
+    print("Total weight: " + str(totalWeight))
+    print("")
+
+    # Benchmark against the original loop on random data with growing sack sizes
+    rng = np.random.default_rng(1) # Set random seed
+    numItems = 50
+    print("Benchmark with " + str(numItems) + " items:")
+    for sackSize in [100, 1000, 10000, 50000]:
+        weights = rng.integers(1, sackSize // 4 + 2, numItems).tolist()
+        values = rng.integers(1, 100, numItems).tolist()
+
+        startTime = perf_counter()
+        loopValue = knapsack01Loop(weights, values, sackSize)
+        loopTime = perf_counter() - startTime
+
+        startTime = perf_counter()
+        sackContents, totalValue, totalWeight = knapsack_01(weights, values, sackSize)
+        vectorTime = perf_counter() - startTime
+
+        if loopValue != totalValue:
+            print("ERROR: The vectorized solver does not match the loop.")
+        print("sackSize = " + str(sackSize) + ": loop " + str(round(loopTime, 4)) + " sec, vectorized " +
+              str(round(vectorTime, 4)) + " sec (" + str(round(loopTime / vectorTime, 1)) + "x faster)")
+    print("")
+
+    # Peak memory of the full table and the low-memory mode, with growing numbers of items
+    sackSize = 20000
+    print("Peak memory with sackSize = " + str(sackSize) + ":")
+    for numItems in [50, 100, 200, 400]:
+        weights = rng.integers(1, sackSize // 10, numItems).tolist()
+        values = rng.integers(1, 100, numItems).tolist()
+        peakMemory = {}
+        results = {}
+        for lowMemory in [False, True]:
+            tracemalloc.start()
+            results[lowMemory] = knapsack_01(weights, values, sackSize, lowMemory)
+            peakMemory[lowMemory] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        if results[False] != results[True]:
+            print("ERROR: The low-memory mode does not match the full table.")
+        print("numItems = " + str(numItems) + ": full table " + str(peakMemory[False] // 1024) + " KB, low memory " +
+              str(peakMemory[True] // 1024) + " KB")
+    print("")
+
+    # Slide data, as in multidimensional_knapsack_dp.py
+    itemMoney = [2,3,4,5,4,3,2,1,5,4,4,6,9,4,3,6,4,6,2,4]
+    itemWeight = [1,3,3,5,6,4,2,4,6,3,5,6,4,3,2,4,3,4,3,4]
+    itemTime = [2,4,4,5,7,3,4,6,7,3,6,3,5,6,4,6,7,4,6,4]
+    itemValue = [4,3,6,7,4,3,8,4,3,5,3,5,3,5,3,6,3,4,2,1]
+    resources = list(zip(itemMoney, itemWeight, itemTime))
+    for lowMemory in [False, True]:
+        sackContents, totalValue, totalResources = knapsack_multidim(itemValue, resources, [17, 20, 30], lowMemory)
+        print("Multidimensional knapsack" + (" (low memory)" if lowMemory else "") + ": items " + str(sackContents) +
+              ", total value " + str(totalValue) + ", total money/weight/time " + str(totalResources))
+    print("")
+
+    # Benchmark against the original nested loops, with the slide items repeated to scale up the instance
+    print("Multidimensional benchmark with the slide instance scaled up:")
+    for copies in [1, 5, 10, 20]:
+        scaledValue = itemValue * copies
+        scaledResources = resources * copies
+
+        startTime = perf_counter()
+        loopValue = multidimKnapsackLoop(scaledValue, scaledResources, [17, 20, 30])
+        loopTime = perf_counter() - startTime
+
+        startTime = perf_counter()
+        sackContents, totalValue, totalResources = knapsack_multidim(scaledValue, scaledResources, [17, 20, 30])
+        vectorTime = perf_counter() - startTime
+
+        if loopValue != totalValue:
+            print("ERROR: The vectorized solver does not match the loop.")
+        print("numItems = " + str(len(scaledValue)) + ": loop " + str(round(loopTime, 4)) + " sec, vectorized " +
+              str(round(vectorTime, 4)) + " sec (" + str(round(loopTime / vectorTime, 1)) + "x faster)")
+    print("")
+
+    # Full table in memory and on disk, for the slide instance scaled up with a bigger sack
+    scaledValue = itemValue * 20
+    scaledResources = resources * 20
+    scaledCapacities = [60, 70, 100]
+    print("Multidimensional table of " + str(len(scaledValue)+1) + " x " + " x ".join(str(c+1) for c in scaledCapacities) + " cells:")
+    results = {}
+    for scratchDir in [None, tempfile.gettempdir()]:
+        tracemalloc.start()
+        startTime = perf_counter()
+        results[scratchDir] = knapsack_multidim(scaledValue, scaledResources, scaledCapacities, scratchDir=scratchDir)
+        solveTime = perf_counter() - startTime
+        peakMemory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(("in memory" if scratchDir is None else "memory-mapped") + ": " + str(round(solveTime, 4)) + " sec, peak memory " +
+              str(peakMemory // 1024**2) + " MB")
+    if results[None] != results[tempfile.gettempdir()]:
+        print("ERROR: The memory-mapped table does not match the table in memory.")
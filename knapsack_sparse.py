@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""
+Sparse solver for the 0-1 knapsack problem, for sacks with very large capacities.
+Instead of a dense value table over every capacity (as in dp_knapsack_example (1).py),
+keeps a list of non-dominated (weight, value) states after each item: no other state
+is both lighter and at least as valuable.  Lists are merged as sorted NumPy arrays.
+
+Also provides knapsack_01_auto, which picks the dense or sparse solver based on an
+estimate of the number of states.
+"""
+# Import
+import numpy as np
+from time import perf_counter
+
+from knapsack_dp import knapsack_01
+
+sparseCostFactor = 8 # Rough cost of one sparse state relative to one dense table cell (merging, sorting, filtering)
+
+def addItemPareto(stateWeight, stateValue, w, v, capacity):
+    ''' Merge the states that skip an item with the states that take it, and drop dominated states
+    stateWeight: weight of each state, strictly increasing (numpy array)
+    stateValue: value of each state, strictly increasing (numpy array)
+    w, v: weight and value of the item (int)
+    capacity: size of the sack (int)
+    Returns the new [stateWeight, stateValue].
+    '''
+    fits = stateWeight <= capacity - w # States that still have room for this item
+    newWeight = stateWeight[fits] + w
+    newValue = stateValue[fits] + v
+
+    # Merge the two sorted lists; new states go after old states of equal weight
+    numStates = stateWeight.size + newWeight.size
+    positions = np.searchsorted(stateWeight, newWeight, side='right') + np.arange(newWeight.size)
+    isNew = np.zeros(numStates, dtype=bool)
+    isNew[positions] = True
+    mergedWeight = np.empty(numStates, dtype=np.int64)
+    mergedValue = np.empty(numStates, dtype=np.int64)
+    mergedWeight[isNew] = newWeight
+    mergedWeight[~isNew] = stateWeight
+    mergedValue[isNew] = newValue
+    mergedValue[~isNew] = stateValue
+
+    # Keep states worth more than every lighter (or equally heavy, earlier) state
+    keep = np.ones(numStates, dtype=bool)
+    keep[1:] = mergedValue[1:] > np.maximum.accumulate(mergedValue)[:-1]
+    mergedWeight = mergedWeight[keep]
+    mergedValue = mergedValue[keep]
+
+    # Of several states with equal weight, only the last (most valuable) one survives
+    keep = np.ones(mergedWeight.size, dtype=bool)
+    keep[:-1] = mergedWeight[1:] != mergedWeight[:-1]
+    return [mergedWeight[keep], mergedValue[keep]]
+
+def bestValueWithin(stateWeight, stateValue, k):
+    # Best value using at most k capacity, i.e. the dense value table entry at k
+    return stateValue[np.searchsorted(stateWeight, k, side='right') - 1]
+
+def knapsack_01_sparse(weights, values, capacity):
+    ''' Input data
+    weights: weight of each item (list; weights[0] is item 1)
+    values: value of each item (list; values[0] is item 1)
+    capacity: size of the sack (int)
+    Returns [sackContents, totalValue, totalWeight], the same selection as knapsack_01.
+    '''
+    numItems = len(weights)
+    itemWeight = [0] + [int(w) for w in weights] # 0th item is placeholder, to allow one-based indexing
+    itemValue = [0] + [int(v) for v in values]
+
+    # Non-dominated states after each item; item 0 is the empty sack
+    states = [[np.zeros(1, dtype=np.int64), np.zeros(1, dtype=np.int64)]]
+    for i in range(1,numItems+1): # For each item
+        states.append(addItemPareto(states[i-1][0], states[i-1][1], itemWeight[i], itemValue[i], capacity))
+
+    # Obtain solution from the state lists, exactly as backtracking through the dense table
+    k = capacity
+    sackContents = [] # Items that are selected
+    for i in range(numItems, 0, -1):
+        if bestValueWithin(*states[i], k) != bestValueWithin(*states[i-1], k):
+            sackContents.append(i)
+            k -= itemWeight[i]
+    sackContents.sort() # Sort smallest to largest
+
+    totalValue = sum(itemValue[i] for i in sackContents)
+    totalWeight = sum(itemWeight[i] for i in sackContents)
+    return [sackContents, totalValue, totalWeight]
+
+def estimateNumStates(weights, values, capacity):
+    # Upper bound on the number of non-dominated states in a list: their weights are distinct
+    # and at most capacity, and their values are distinct and at most the total value.
+    return min(capacity + 1, sum(int(v) for v in values) + 1, 2 ** min(len(weights), 62))
+
+def chooseKnapsackMethod(weights, values, capacity):
+    # 'sparse' if the state lists should be much smaller than a dense table row, otherwise 'dense'
+    if estimateNumStates(weights, values, capacity) * sparseCostFactor < capacity + 1:
+        return 'sparse'
+    return 'dense'
+
+def knapsack_01_auto(weights, values, capacity, lowMemory=False):
+    ''' Input data
+    weights, values, capacity: as in knapsack_01
+    lowMemory: passed to knapsack_01 if the dense solver is chosen (bool)
+    Returns [sackContents, totalValue, totalWeight], from whichever solver should be faster.
+    '''
+    if chooseKnapsackMethod(weights, values, capacity) == 'sparse':
+        return knapsack_01_sparse(weights, values, capacity)
+    return knapsack_01(weights, values, capacity, lowMemory)
+
+if __name__ == "__main__":
+    # Slide data, as in dp_knapsack_example (1).py
+    print(knapsack_01_sparse([2,3,4,5], [3,4,5,6], 5))
+    print("")
+
+    # Benchmark against the dense solver with weights in the hundreds of thousands
+    rng = np.random.default_rng(1) # Set random seed
+    numItems = 40
+    for sackSize in [10**5, 10**6, 4 * 10**6]:
+        weights = rng.integers(sackSize // 40, sackSize // 4, numItems).tolist()
+        values = rng.integers(1, 50, numItems).tolist()
+
+        startTime = perf_counter()
+        denseResult = knapsack_01(weights, values, sackSize, lowMemory=True)
+        denseTime = perf_counter() - startTime
+
+        startTime = perf_counter()
+        sparseResult = knapsack_01_sparse(weights, values, sackSize)
+        sparseTime = perf_counter() - startTime
+
+        if denseResult != sparseResult:
+            print("ERROR: The sparse solver does not match the dense solver.")
+        print("sackSize = " + str(sackSize) + ": dense " + str(round(denseTime, 4)) + " sec, sparse " +
+              str(round(sparseTime, 4)) + " sec; automatic choice is " + chooseKnapsackMethod(weights, values, sackSize))
@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+"""
+Knapsack table that answers many 0-1 knapsack budgets for one item catalog.
+The last row of the dynamic programming table in dp_knapsack_example (1).py already
+holds the optimum for every capacity up to sackSize, so the table is built once and
+queried for whole batches of capacities with vectorized lookups and backtracking.
+
+Also provides IncrementalKnapsack, which keeps the table up to date as items are
+appended, removed, or edited, recomputing only the rows that change.
+"""
+# Import
+import numpy as np
+from time import perf_counter
+
+from knapsack_dp import addItem, knapsack_01, valueDtype
+
+class KnapsackTable:
+    ''' Input data
+    weights: weight of each item (list; weights[0] is item 1)
+    values: value of each item (list; values[0] is item 1)
+    maxCapacity: largest sack size that will be queried (int)
+    '''
+    def __init__(self, weights, values, maxCapacity):
+        self.numItems = len(weights)
+        self.maxCapacity = maxCapacity
+        self.itemWeight = np.array([0] + [int(w) for w in weights], dtype=np.int64) # 0th item is placeholder, to allow one-based indexing
+        self.itemValue = np.array([0] + [int(v) for v in values], dtype=np.int64)
+
+        # Only the last row of values is kept, plus one bit per cell saying whether the
+        # value changed when the item was added (which is all that backtracking looks at)
+        layer = np.zeros(maxCapacity+1, dtype=valueDtype(int(np.abs(self.itemValue).sum())))
+        self.takeTable = np.zeros((self.numItems+1,maxCapacity+1), dtype=bool)
+        for i in range(1,self.numItems+1): # For each item
+            previousLayer = layer.copy()
+            addItem(layer, (int(self.itemWeight[i]),), int(self.itemValue[i]))
+            self.takeTable[i] = layer != previousLayer
+        self.lastRow = layer
+
+    def checkCapacities(self, capacities):
+        capacities = np.asarray(capacities, dtype=np.int64)
+        if capacities.size > 0 and (capacities.min() < 0 or capacities.max() > self.maxCapacity):
+            raise ValueError("Capacities must be between 0 and " + str(self.maxCapacity))
+        return capacities
+
+    def best_value(self, capacities):
+        ''' Best total value for each sack size
+        capacities: one sack size (int) or many (list or numpy array)
+        Returns an int, or a numpy array with one value per capacity.
+        '''
+        capacities = self.checkCapacities(capacities)
+        if capacities.ndim == 0:
+            return int(self.lastRow[capacities])
+        return self.lastRow[capacities]
+
+    def items(self, capacities):
+        ''' Selected items for each sack size, as knapsack_01 would choose them
+        capacities: one sack size (int) or many (list or numpy array)
+        Returns a sorted list of item numbers, or a list of such lists (one per capacity).
+        '''
+        capacities = self.checkCapacities(capacities)
+        if capacities.ndim == 0:
+            return self.items(capacities.reshape(1))[0]
+
+        # Backtrack all distinct capacities together, one item at a time
+        uniqueCapacities, queryIndex = np.unique(capacities, return_inverse=True)
+        k = uniqueCapacities.copy()
+        selected = np.zeros((self.numItems+1,k.size), dtype=bool)
+        for i in range(self.numItems, 0, -1):
+            selected[i] = self.takeTable[i, k]
+            k -= selected[i] * self.itemWeight[i]
+
+        contents = [np.flatnonzero(selected[:, q]).tolist() for q in range(uniqueCapacities.size)]
+        return [list(contents[q]) for q in queryIndex.ravel()]
+
+class IncrementalKnapsack:
+    ''' Input data
+    capacity: size of the sack (int)
+    weights, values: initial items, if any (lists; weights[0] is item 1)
+    '''
+    def __init__(self, capacity, weights=None, values=None):
+        weights = list(weights) if weights is not None else [] # Copied, so no instance shares a default list
+        values = list(values) if values is not None else []
+        self.capacity = capacity
+        self.itemWeight = [0] # 0th item is placeholder, to allow one-based indexing
+        self.itemValue = [0]
+        self.rows = [np.zeros(capacity+1, dtype=np.int64)] # rows[i] is the value table row using items 1..i
+        self.numRowUpdates = 0 # Number of item rows computed so far
+        for w, v in zip(weights, values):
+            self.append(w, v)
+
+    def addRow(self, i):
+        # Compute row i from row i-1
+        row = self.rows[i-1].copy() # Carry forward previous solution without this item
+        addItem(row, (self.itemWeight[i],), self.itemValue[i])
+        self.rows.append(row)
+        self.numRowUpdates += 1
+
+    def recomputeFrom(self, k):
+        # Rows before k don't depend on items k..n, so only rows k..n are rebuilt
+        del self.rows[k:]
+        for i in range(k, len(self.itemWeight)):
+            self.addRow(i)
+
+    def append(self, weight, value):
+        # Add a new last item; costs one row update
+        self.itemWeight.append(int(weight))
+        self.itemValue.append(int(value))
+        self.addRow(len(self.itemWeight) - 1)
+
+    def remove(self, k):
+        # Remove item k; later items are renumbered down by one
+        del self.itemWeight[k]
+        del self.itemValue[k]
+        self.recomputeFrom(k)
+
+    def edit(self, k, weight, value):
+        # Change the weight and value of item k
+        self.itemWeight[k] = int(weight)
+        self.itemValue[k] = int(value)
+        self.recomputeFrom(k)
+
+    def solve(self):
+        # Returns [sackContents, totalValue, totalWeight], the same selection as knapsack_01
+        k = self.capacity
+        sackContents = [] # Items that are selected
+        for i in range(len(self.itemWeight) - 1, 0, -1):
+            if self.rows[i][k] != self.rows[i-1][k]:
+                sackContents.append(i)
+                k -= self.itemWeight[i]
+        sackContents.sort() # Sort smallest to largest
+
+        totalValue = sum(self.itemValue[i] for i in sackContents)
+        totalWeight = sum(self.itemWeight[i] for i in sackContents)
+        return [sackContents, totalValue, totalWeight]
+
+if __name__ == "__main__":
+    # Slide data, as in dp_knapsack_example (1).py
+    table = KnapsackTable([2,3,4,5], [3,4,5,6], 5)
+    print("Best values for sack sizes 0-5: " + str(table.best_value(range(6))))
+    print("Selected items for sack sizes 0-5: " + str(table.items(range(6))))
+    print("")
+
+    # One catalog, many sack sizes: compare with a fresh solve per sack size
+    rng = np.random.default_rng(1) # Set random seed
+    numItems = 200
+    maxCapacity = 5000
+    weights = rng.integers(1, 200, numItems).tolist()
+    values = rng.integers(1, 100, numItems).tolist()
+    sackSizes = rng.integers(0, maxCapacity+1, 500)
+
+    startTime = perf_counter()
+    freshResults = [knapsack_01(weights, values, int(w)) for w in sackSizes]
+    freshTime = perf_counter() - startTime
+
+    startTime = perf_counter()
+    table = KnapsackTable(weights, values, maxCapacity)
+    bestValues = table.best_value(sackSizes)
+    sackContents = table.items(sackSizes)
+    tableTime = perf_counter() - startTime
+
+    if [r[0] for r in freshResults] != sackContents or [r[1] for r in freshResults] != bestValues.tolist():
+        print("ERROR: The table does not match fresh solves.")
+    print(str(len(sackSizes)) + " sack sizes: fresh solves " + str(round(freshTime, 4)) + " sec, one table " +
+          str(round(tableTime, 4)) + " sec")
+    print("")
+
+    # Random sequences of appends, removals and edits, each checked against a fresh solve
+    sackSize = 1000
+    incremental = IncrementalKnapsack(sackSize, rng.integers(1, 200, 50).tolist(), rng.integers(1, 100, 50).tolist())
+    numMismatches = 0
+    numEdits = 300
+    for edit in range(numEdits):
+        numItems = len(incremental.itemWeight) - 1
+        action = rng.integers(3) if numItems > 0 else 0
+        if action == 0:
+            incremental.append(rng.integers(1, 200), rng.integers(1, 100))
+        elif action == 1:
+            incremental.remove(int(rng.integers(1, numItems+1)))
+        else:
+            incremental.edit(int(rng.integers(1, numItems+1)), rng.integers(1, 200), rng.integers(1, 100))
+        if incremental.solve() != knapsack_01(incremental.itemWeight[1:], incremental.itemValue[1:], sackSize):
+            numMismatches += 1
+    print(str(numEdits) + " random edits: " + str(numMismatches) + " mismatches with a fresh solve, " +
+          str(incremental.numRowUpdates) + " row updates in total")
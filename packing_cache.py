@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+Feasibility cache for the packing subproblem in boxes_in_trucks.py.
+The lazy constraint callback checks the same boxes against the same truck many times,
+so results are stored under a canonical key that only depends on the box dimensions
+and container dimensions (not on box or truck numbers): identical boxes and identical
+trucks share one entry.
+
+Least-recently-used entries are evicted once the cache is full.  The cache can also be
+backed by a file on disk (using shelve), so that repeated runs reuse earlier results.
+"""
+# Import
+import shelve
+from collections import OrderedDict
+
+def swapFirstTwoDims(dims):
+    # The same box or container seen with dimensions 1 and 2 swapped
+    return (dims[1], dims[0]) + tuple(dims[2:])
+
+def canonicalPackingKey(theBoxes, boxSize, containerSize):
+    ''' Input data
+    theBoxes: the boxes to pack into container (list)
+    boxSize: size of each box, in each of three dimensions [box, dim, orientation] (dict)
+    containerSize: size of this container, in each of three dimensions (list)
+    Returns a hashable key: the sorted multiset of box shapes (each the sorted pair of its two
+    orientations) plus the container dimensions.  Mirroring the whole problem, by swapping
+    dimensions 1 and 2 of the container and of every box, gives an equivalent packing problem,
+    so the smaller of the two keys is used.
+    '''
+    boxShapes = []
+    mirroredShapes = []
+    for b in theBoxes:
+        orientations = [tuple(boxSize[b,d,o] for d in range(1,4)) for o in range(1,3)]
+        boxShapes.append(tuple(sorted(orientations)))
+        mirroredShapes.append(tuple(sorted(swapFirstTwoDims(dims) for dims in orientations)))
+    key = (tuple(sorted(boxShapes)), tuple(containerSize))
+    mirroredKey = (tuple(sorted(mirroredShapes)), swapFirstTwoDims(tuple(containerSize)))
+    return min(key, mirroredKey)
+
+class PackingCache:
+    ''' Input data
+    solver: function called on a cache miss by isFeasible, with the signature of solvePackingSubproblem
+    (function; optional when results are looked up and stored directly, as in boxes_in_trucks.py)
+    maxSize: maximum number of entries kept in memory (int)
+    cacheFileName: if given, results are also stored in this file and reused by later runs (str)
+    '''
+    def __init__(self, solver=None, maxSize=10000, cacheFileName=None):
+        self.solver = solver
+        self.maxSize = maxSize
+        self.entries = OrderedDict() # Canonical key: feasible (bool), least recently used first
+        self.hits = 0 # Results found in memory
+        self.diskHits = 0 # Results found in the cache file
+        self.misses = 0 # Results that needed a solve
+        self.diskCache = shelve.open(cacheFileName) if cacheFileName is not None else None
+
+    def lookup(self, key):
+        # Cached result for this key, or None if it isn't known (counted as a miss)
+        if key in self.entries:
+            self.entries.move_to_end(key) # Mark as most recently used
+            self.hits += 1
+            return self.entries[key]
+        if self.diskCache is not None and repr(key) in self.diskCache:
+            self.diskHits += 1
+            isFeasible = self.diskCache[repr(key)]
+            self.store(key, isFeasible, saveToDisk=False)
+            return isFeasible
+        self.misses += 1
+        return None
+
+    def store(self, key, isFeasible, saveToDisk=True):
+        self.entries[key] = isFeasible
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.maxSize:
+            self.entries.popitem(last=False) # Evict least recently used
+        if saveToDisk and self.diskCache is not None:
+            self.diskCache[repr(key)] = isFeasible
+
+    def isFeasible(self, theBoxes, boxSize, containerSize):
+        # Same inputs and result as solvePackingSubproblem, solving only if the result isn't cached
+        key = canonicalPackingKey(theBoxes, boxSize, containerSize)
+        isFeasible = self.lookup(key)
+        if isFeasible is None:
+            isFeasible = self.solver(theBoxes, boxSize, containerSize)
+            self.store(key, isFeasible)
+        return isFeasible
+
+    def stats(self):
+        return "Packing cache: " + str(self.hits) + " hits, " + str(self.diskHits) + " disk hits, " + \
+               str(self.misses) + " misses, " + str(len(self.entries)) + " entries in memory"
+
+    def close(self):
+        if self.diskCache is not None:
+            self.diskCache.close()
+            self.diskCache = None
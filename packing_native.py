@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""
+Packing subproblem for boxes-in-truck problem, for one truck, without CPLEX.
+Checks feasibility, given boxes and truck, answering the same question as both models in
+packing_subproblem.py: integer positions, two possible orientations per box, boxes inside
+the container and not overlapping.  Can be used in place of packing_subproblem.py, with the same
+solvePackingSubproblem(theBoxes, boxSize, containerSize) function.
+
+Solves with an exact branch-and-bound over box placements:
+ - Boxes are placed largest first.  Each box tries the extreme points of the boxes already
+   placed first (bottom, back, left first), then every other allowed position.
+ - Positions are limited to normal patterns (sums of box sizes in that dimension), which
+   loses no solutions: any packing can be pushed towards the origin until every box sits
+   at such a coordinate.
+ - The positions where a box doesn't overlap any placed box are found with NumPy slicing.
+ - A node is pruned if the remaining boxes' volume exceeds the free volume, or if some
+   remaining box has nowhere left to go.  Identical boxes are placed in increasing position.
+"""
+# Import
+import numpy as np
+from time import perf_counter
+
+from packing_prefilter import boxOrientations, extremePointPack, someBoxTooLarge, volumeTooLarge
+
+class SearchTimeout(Exception):
+    pass
+
+def normalPatterns(theBoxes, boxSize, containerSize):
+    # For each dimension, a boolean array marking coordinates that are a sum of box sizes in that dimension
+    patterns = []
+    for d in range(3):
+        reachable = np.zeros(containerSize[d], dtype=bool)
+        reachable[0] = True
+        for b in theBoxes:
+            sizes = set(dims[d] for dims in boxOrientations(b, boxSize))
+            shifted = reachable.copy()
+            for s in sizes:
+                if s < containerSize[d]:
+                    shifted[s:] |= reachable[:containerSize[d]-s]
+            reachable = shifted
+        patterns.append(reachable)
+    return patterns
+
+def allowedOrigins(dims, containerSize, placedPositions, placedDims, patterns):
+    # Boolean grid of origins where a box with dims fits in the container without overlapping placed boxes
+    if any(dims[d] > containerSize[d] for d in range(3)):
+        return None
+    grid = np.ones(tuple(containerSize[d] - dims[d] + 1 for d in range(3)), dtype=bool)
+    for d in range(3): # Only normal pattern coordinates
+        shape = [1, 1, 1]
+        shape[d] = grid.shape[d]
+        grid &= patterns[d][:grid.shape[d]].reshape(shape)
+    for position, size in zip(placedPositions, placedDims):
+        # Origins in (position - dims, position + size) overlap the placed box in every dimension
+        region = tuple(slice(max(0, position[d] - dims[d] + 1), max(0, position[d] + size[d])) for d in range(3))
+        grid[region] = False
+    return grid
+
+def findPacking(theBoxes, boxSize, containerSize, timeLimit=10, startingPlacement=None):
+    ''' Input data
+    theBoxes, boxSize, containerSize: as in solvePackingSubproblem
+    timeLimit: maximum search time in seconds (float)
+    startingPlacement: suggested placement of some of the boxes, tried first but not kept fixed (dict of box: [position, orientation])
+    Returns [placement, timedOut]: a dict of box: [position, orientation] for every box, or None
+    if the boxes can't be packed (or the time limit was reached, in which case timedOut is True).
+    '''
+    deadline = perf_counter() + timeLimit
+    containerSize = [int(c) for c in containerSize]
+    if volumeTooLarge(theBoxes, boxSize, containerSize) or someBoxTooLarge(theBoxes, boxSize, containerSize):
+        return [None, False]
+    heuristicPlacement = extremePointPack(theBoxes, boxSize, containerSize)
+    if heuristicPlacement is not None: # Quick success
+        return [heuristicPlacement, False]
+
+    # Boxes to place, largest first, with identical boxes next to each other
+    toPlace = list(theBoxes)
+    shapes = {b: tuple(sorted(set(boxOrientations(b, boxSize)))) for b in toPlace}
+    toPlace.sort(key=lambda b: (min(np.prod(dims) for dims in shapes[b]), shapes[b]), reverse=True)
+    patterns = normalPatterns(theBoxes, boxSize, containerSize)
+    containerVolume = int(np.prod(containerSize))
+    boxVolume = {b: min(int(np.prod(dims)) for dims in shapes[b]) for b in toPlace}
+
+    placement = {}
+    placedPositions = []
+    placedDims = []
+    numNodes = [0]
+
+    def search(k, usedVolume, lastOfShape):
+        # Place toPlace[k], toPlace[k+1], ...; True if all placed
+        if k == len(toPlace):
+            return True
+        numNodes[0] += 1
+        if numNodes[0] % 100 == 0 and perf_counter() > deadline:
+            raise SearchTimeout()
+        if containerVolume - usedVolume < sum(boxVolume[b] for b in toPlace[k:]):
+            return False
+
+        # Allowed positions for every remaining shape; if one has none, this branch is dead
+        grids = {}
+        for b in toPlace[k:]:
+            for dims in shapes[b]:
+                if dims not in grids:
+                    grids[dims] = allowedOrigins(dims, containerSize, placedPositions, placedDims, patterns)
+            if not any(grids[dims] is not None and grids[dims].any() for dims in shapes[b]):
+                return False
+
+        b = toPlace[k]
+        orientations = boxOrientations(b, boxSize)
+        extremePoints = set([(0,0,0)])
+        for position, size in zip(placedPositions, placedDims):
+            for d in range(3):
+                point = list(position)
+                point[d] += size[d]
+                extremePoints.add(tuple(point))
+        shapeOrientations = list(shapes[b])
+        if startingPlacement and b in startingPlacement: # Suggested orientation first
+            shapeOrientations.sort(key=lambda dims: dims != orientations[startingPlacement[b][1]-1])
+        for dims in shapeOrientations:
+            if grids[dims] is None:
+                continue
+            candidates = [tuple(int(c) for c in p) for p in np.argwhere(grids[dims])]
+            minimumPosition = lastOfShape.get(shapes[b], None) # Identical boxes go in increasing (z, y, x) order
+            if minimumPosition is not None:
+                candidates = [p for p in candidates if (p[2], p[1], p[0]) > (minimumPosition[2], minimumPosition[1], minimumPosition[0])]
+            hint = tuple(startingPlacement[b][0]) if startingPlacement and b in startingPlacement else None
+            candidates.sort(key=lambda p: (p != hint, p not in extremePoints, p[2], p[1], p[0])) # Suggested position, then extreme points first
+            for position in candidates:
+                placedPositions.append(position)
+                placedDims.append(dims)
+                placement[b] = [position, orientations.index(dims) + 1]
+                nextLastOfShape = dict(lastOfShape)
+                nextLastOfShape[shapes[b]] = position
+                if search(k+1, usedVolume + int(np.prod(dims)), nextLastOfShape):
+                    return True
+                placedPositions.pop()
+                placedDims.pop()
+                del placement[b]
+        return False
+
+    try:
+        if search(0, 0, {}):
+            return [placement, False]
+        return [None, False]
+    except SearchTimeout:
+        return [None, True]
+
+def solvePackingSubproblem(theBoxes, boxSize, containerSize, timeLimit=10):
+    ''' Input data
+    theBoxes: the boxes to pack into container (list)
+    boxSize: size of each box, in each of three dimensions [box, dim, orientation] (dict)
+    containerSize: size of this container, in each of three dimensions (list)
+    timeLimit: maximum search time in seconds (float)
+    '''
+    print("Solving model....")
+    placement, timedOut = findPacking(theBoxes, boxSize, containerSize, timeLimit)
+    if timedOut:
+        print("Time limit reached; treating packing as infeasible.")
+    return placement is not None
+
+if __name__ == "__main__":
+    # Random boxes, generated as in boxes_in_trucks.py, in a truck of size 6 x 6 x 6
+    from random import sample
+    from packing_prefilter import randomBoxSizes
+    boxSize = randomBoxSizes(20)
+    for numBoxes in [6, 8, 10, 12, 14]:
+        theBoxes = sorted(sample(range(1, 21), numBoxes))
+        startTime = perf_counter()
+        placement, timedOut = findPacking(theBoxes, boxSize, [6, 6, 6])
+        print(str(numBoxes) + " boxes: " + ("time limit reached" if timedOut else "feasible" if placement is not None else "infeasible") +
+              " (" + str(round(perf_counter() - startTime, 4)) + " sec)")
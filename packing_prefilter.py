@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""
+Fast checks to run before the CP packing model in packing_subproblem.py.
+Many packing subproblems can be settled cheaply:
+ - If the boxes' total volume is more than the container's, they can't fit.
+ - If some box doesn't fit in the empty container in either orientation, they can't fit.
+ - If a quick extreme-point heuristic packs every box, they fit.
+Only when none of these give an answer is the CP model solved.  The checks answer the same
+question as both CP models: can the boxes be given integer positions and one of their two
+orientations so that each is inside the container and no two overlap.
+"""
+# Import
+import numpy as np
+import random
+
+def randomBoxSizes(numBoxes, seed=1):
+    # Random box sizes, by (box, dim, orientation), with lengths, widths and heights of 1-4 as in boxes_in_trucks.py,
+    # for the benchmarks in the packing modules (seeds the random module, so later sampling is repeatable too)
+    random.seed(seed) # Set random seed
+    boxSize = {}
+    for b in range(1, numBoxes+1):
+        theLength = random.randrange(1, 5)
+        theWidth = random.randrange(1, 5)
+        theHeight = random.randrange(1, 5)
+        boxSize[b,1,1] = theLength
+        boxSize[b,2,2] = theLength
+        boxSize[b,2,1] = theWidth
+        boxSize[b,1,2] = theWidth
+        boxSize[b,3,1] = theHeight
+        boxSize[b,3,2] = theHeight
+    return boxSize
+
+def boxOrientations(b, boxSize):
+    # Dimensions of box b in each of its two orientations
+    return [(boxSize[b,1,o], boxSize[b,2,o], boxSize[b,3,o]) for o in range(1,3)]
+
+def volumeTooLarge(theBoxes, boxSize, containerSize):
+    # True if the boxes' total volume (using each box's smaller orientation volume) exceeds the container's
+    totalVolume = sum(min(int(np.prod(dims)) for dims in boxOrientations(b, boxSize)) for b in theBoxes)
+    return totalVolume > int(np.prod(containerSize))
+
+def someBoxTooLarge(theBoxes, boxSize, containerSize):
+    # True if some box doesn't fit in the empty container in either orientation
+    for b in theBoxes:
+        if not any(all(dims[d] <= containerSize[d] for d in range(3)) for dims in boxOrientations(b, boxSize)):
+            return True
+    return False
+
+def overlapsPlaced(position, dims, placedPositions, placedDims):
+    # True if a box at position with dims overlaps any placed box (placed boxes are rows of the arrays)
+    if placedPositions.shape[0] == 0:
+        return False
+    return bool(np.any(np.all((position < placedPositions + placedDims) & (placedPositions < position + dims), axis=1)))
+
+def extremePointPack(theBoxes, boxSize, containerSize, placement=None):
+    ''' Heuristic packing: place boxes largest first, each at the lowest, back-most, left-most
+    extreme point (a corner next to an already placed box) where it fits.
+    theBoxes, boxSize, containerSize: as in solvePackingSubproblem
+    placement: boxes already placed, which are kept where they are (dict, as returned below)
+    Returns a dict of box: [position, orientation] for every box in theBoxes, or None if the
+    heuristic fails (which doesn't mean the boxes can't fit).
+    '''
+    container = np.array(containerSize)
+    placement = dict(placement) if placement is not None else {}
+    placedPositions = np.array([placement[b][0] for b in placement], dtype=np.int64).reshape(-1, 3)
+    placedDims = np.array([boxOrientations(b, boxSize)[placement[b][1]-1] for b in placement], dtype=np.int64).reshape(-1, 3)
+
+    # Candidate corners: the container origin, and the three far corners of each placed box
+    points = {(0,0,0)}
+    for position, dims in zip(placedPositions, placedDims):
+        for d in range(3):
+            point = position.copy()
+            point[d] += dims[d]
+            points.add(tuple(int(p) for p in point))
+
+    toPlace = [b for b in theBoxes if b not in placement]
+    toPlace.sort(key=lambda b: (min(np.prod(dims) for dims in boxOrientations(b, boxSize)),
+                                max(max(dims) for dims in boxOrientations(b, boxSize))), reverse=True) # Largest first
+    for b in toPlace:
+        found = False
+        for point in sorted(points, key=lambda p: (p[2], p[1], p[0])): # Bottom, then back, then left
+            position = np.array(point)
+            for o, dims in enumerate(boxOrientations(b, boxSize), start=1):
+                dims = np.array(dims)
+                if np.all(position + dims <= container) and not overlapsPlaced(position, dims, placedPositions, placedDims):
+                    found = True
+                    break
+            if found:
+                break
+        if not found:
+            return None
+
+        placement[b] = [point, o]
+        placedPositions = np.vstack((placedPositions, position))
+        placedDims = np.vstack((placedDims, dims))
+        points.discard(point)
+        for d in range(3):
+            newPoint = list(point)
+            newPoint[d] += int(dims[d])
+            if newPoint[d] < containerSize[d]:
+                points.add(tuple(newPoint))
+    return placement
+
+class TieredPackingCheck:
+    ''' Input data
+    solver: exact check used by isFeasible when the fast checks don't decide, with the signature of solvePackingSubproblem
+    (function; optional when only quickCheck is used, as in boxes_in_trucks.py)
+    onPlacement: called as onPlacement(theBoxes, containerSize, placement) when the heuristic packs the boxes (function, optional)
+    '''
+    def __init__(self, solver=None, onPlacement=None):
+        self.solver = solver
+        self.onPlacement = onPlacement
+        self.tierCounts = {'volume': 0, 'box size': 0, 'heuristic': 0, 'CP': 0} # Number of calls decided by each tier
+        self.decidedBy = [] # Tier that decided each call, in order
+
+    def decide(self, tier, isFeasible):
+        self.tierCounts[tier] += 1
+        self.decidedBy.append(tier)
+        return isFeasible
+
+    def quickCheck(self, theBoxes, boxSize, containerSize):
+        # Result of the fast checks, or None if they don't decide
+        if volumeTooLarge(theBoxes, boxSize, containerSize):
+            return self.decide('volume', False)
+        if someBoxTooLarge(theBoxes, boxSize, containerSize):
+            return self.decide('box size', False)
+        placement = extremePointPack(theBoxes, boxSize, containerSize)
+        if placement is not None:
+            if self.onPlacement is not None:
+                self.onPlacement(theBoxes, containerSize, placement)
+            return self.decide('heuristic', True)
+        return None
+
+    def isFeasible(self, theBoxes, boxSize, containerSize):
+        # Same inputs and result as solvePackingSubproblem
+        isFeasible = self.quickCheck(theBoxes, boxSize, containerSize)
+        if isFeasible is None:
+            isFeasible = self.decide('CP', self.solver(theBoxes, boxSize, containerSize))
+        return isFeasible
+
+    def stats(self):
+        return "Packing checks decided by each tier: " + ", ".join(tier + " " + str(count) for tier, count in self.tierCounts.items())
@@ -5,26 +5,25 @@ Checks feasibility, given boxes and truck.
 Assumes each box has only two possible orientations.
 Solves using constraint programming.
 
+Two model builders are available, for the same packing question (boxes inside the container
+and not overlapping): the original model, with a non-overlap disjunction for every ordered
+pair of boxes, and a compact model with one per unordered pair, plus symmetry breaking for
+identical boxes and boxes whose two orientations are the same.  Run this file directly to compare
+their CP solve times on random box subsets.
+
 Requirements: 
  - CPLEX (or other Pyomo-compatible solver)
 """
 
 # Import 
 from docplex.cp.model import CpoModel
-from docplex.cp.solution import CpoRefineConflictResult
+from docplex.cp.modeler import lexicographic
+from docplex.cp.solution import CpoModelSolution, CpoRefineConflictResult, SOLVE_STATUS_INFEASIBLE
 from sys import stdout
+from time import perf_counter
 
-def solvePackingSubproblem(theBoxes, boxSize, containerSize):
-    ''' Input data
-    theBoxes: the boxes to pack into container (list)
-    boxSize: size of each box, in each of three dimensions [box, dim, orientation] (dict)
-    containerSize: size of this container, in each of three dimensions (list)
-    '''
-
-    # Create a CPO model
-    model = CpoModel()
-
-    # Create variables
+def createPackingVariables(model, theBoxes, containerSize):
+    # Create POSITION and ORIENTATION variables, shared by both model builders
     maxPosition = max(containerSize)
     theKeys = []
     for b in theBoxes: # Each box and dimension
@@ -37,16 +36,31 @@ def solvePackingSubproblem(theBoxes, boxSize, containerSize):
         theKeys.append((b,1))
         theKeys.append((b,2))
     ORIENTATION = model.binary_var_dict(theKeys, "ORIENTATION") # For each box, indicates which orientation
+    return [POSITION, ORIENTATION]
+
+def buildPackingModel(theBoxes, boxSize, containerSize):
+    ''' Original model: a non-overlap constraint for every ordered pair of boxes (so each pair twice)
+    Input data as in solvePackingSubproblem.  Returns [model, POSITION, ORIENTATION].
+    '''
+
+    # Create a CPO model
+    model = CpoModel()
+
+    # Create variables
+    POSITION, ORIENTATION = createPackingVariables(model, theBoxes, containerSize)
 
     # Add constraints
-    # Ensure boxes aren't closer than touching (i.e., overlapping each other)
+    # Ensure boxes aren't closer than touching (i.e., overlapping each other): i before j, or j before i, in some dimension
     for i in theBoxes:
         for j in theBoxes:
             if i != j:
                 model.add(
                 ( POSITION[(i,1)] + boxSize[i,1,1] * ORIENTATION[(i,1)] + boxSize[i,1,2] * ORIENTATION[(i,2)] <= POSITION[(j,1)] ) |  
+                ( POSITION[(j,1)] + boxSize[j,1,1] * ORIENTATION[(j,1)] + boxSize[j,1,2] * ORIENTATION[(j,2)] <= POSITION[(i,1)] ) |  # Dim 1
                 ( POSITION[(i,2)] + boxSize[i,2,1] * ORIENTATION[(i,1)] + boxSize[i,2,2] * ORIENTATION[(i,2)] <= POSITION[(j,2)] ) |  
-                ( POSITION[(i,3)] + boxSize[i,3,1] * ORIENTATION[(i,1)] + boxSize[i,3,2] * ORIENTATION[(i,2)] <= POSITION[(j,3)] ) )  # Dim 3
+                ( POSITION[(j,2)] + boxSize[j,2,1] * ORIENTATION[(j,1)] + boxSize[j,2,2] * ORIENTATION[(j,2)] <= POSITION[(i,2)] ) |  # Dim 2
+                ( POSITION[(i,3)] + boxSize[i,3,1] * ORIENTATION[(i,1)] + boxSize[i,3,2] * ORIENTATION[(i,2)] <= POSITION[(j,3)] ) |  
+                ( POSITION[(j,3)] + boxSize[j,3,1] * ORIENTATION[(j,1)] + boxSize[j,3,2] * ORIENTATION[(j,2)] <= POSITION[(i,3)] ) )  # Dim 3
 
 	# Ensure boxes are inside container
     for d in range(1,4): # For each dimension
@@ -58,13 +72,131 @@ def solvePackingSubproblem(theBoxes, boxSize, containerSize):
     for i in theBoxes:
         model.add(ORIENTATION[i,1] + ORIENTATION[i,2] == 1)
 
+    return [model, POSITION, ORIENTATION]
+
+def buildCompactPackingModel(theBoxes, boxSize, containerSize):
+    ''' Compact model: one non-overlap disjunction per unordered pair of boxes (i before j or
+    j before i, in some dimension), with symmetry breaking:
+     - identical boxes are placed in lexicographic order of position
+     - boxes whose two orientations have the same dimensions are fixed in orientation 1
+    Input data as in solvePackingSubproblem.  Returns [model, POSITION, ORIENTATION].
+    '''
+
+    # Create a CPO model
+    model = CpoModel()
+
+    # Create variables
+    POSITION, ORIENTATION = createPackingVariables(model, theBoxes, containerSize)
+
+    def size(i, d):
+        # Size of box i in dimension d, given its orientation
+        return boxSize[i,d,1] * ORIENTATION[(i,1)] + boxSize[i,d,2] * ORIENTATION[(i,2)]
+
+    # Add constraints
+    # Ensure boxes aren't overlapping each other: for each pair, one is before the other in some dimension
+    for a in range(len(theBoxes)):
+        for b in range(a+1, len(theBoxes)):
+            i = theBoxes[a]
+            j = theBoxes[b]
+            model.add(
+            ( POSITION[(i,1)] + size(i,1) <= POSITION[(j,1)] ) | ( POSITION[(j,1)] + size(j,1) <= POSITION[(i,1)] ) |
+            ( POSITION[(i,2)] + size(i,2) <= POSITION[(j,2)] ) | ( POSITION[(j,2)] + size(j,2) <= POSITION[(i,2)] ) |
+            ( POSITION[(i,3)] + size(i,3) <= POSITION[(j,3)] ) | ( POSITION[(j,3)] + size(j,3) <= POSITION[(i,3)] ) )
+
+    # Ensure boxes are inside container
+    for d in range(1,4): # For each dimension
+        for i in theBoxes:
+            model.add( POSITION[(i,d)] + size(i,d) <= containerSize[d-1] )
+
+    # Ensure each box has an orientation
+    for i in theBoxes:
+        model.add(ORIENTATION[i,1] + ORIENTATION[i,2] == 1)
+
+    # Symmetry breaking
+    previousOfShape = {} # Last box seen with each shape (sorted pair of orientations)
+    for i in theBoxes:
+        orientations = [tuple(boxSize[i,d,o] for d in range(1,4)) for o in range(1,3)]
+        if orientations[0] == orientations[1]: # Both orientations are the same (e.g., square footprint)
+            model.add(ORIENTATION[i,1] == 1)
+        shape = tuple(sorted(orientations))
+        if shape in previousOfShape: # Identical to an earlier box, so the two can be swapped in any solution
+            j = previousOfShape[shape]
+            model.add(lexicographic([POSITION[(j,d)] for d in range(1,4)], [POSITION[(i,d)] for d in range(1,4)]))
+        previousOfShape[shape] = i
+
+    return [model, POSITION, ORIENTATION]
+
+def findPacking(theBoxes, boxSize, containerSize, compact=False, startingPlacement=None):
+    ''' Input data as in solvePackingSubproblem, plus
+    startingPlacement: placement of some of the boxes to give the solver as a starting point,
+    e.g. from an earlier feasible load of this truck (dict of box: [position, orientation])
+    Returns [placement, timedOut]: a dict of box: [position, orientation] for every box, or None
+    if the boxes can't be packed (or the time limit was reached, in which case timedOut is True).
+    '''
+
+    # Create a CPO model
+    if compact:
+        model, POSITION, ORIENTATION = buildCompactPackingModel(theBoxes, boxSize, containerSize)
+    else:
+        model, POSITION, ORIENTATION = buildPackingModel(theBoxes, boxSize, containerSize)
+
+    # Starting point: the known positions and orientations of boxes already placed
+    if startingPlacement:
+        startingPoint = CpoModelSolution()
+        for b in theBoxes:
+            if b in startingPlacement:
+                position, orientation = startingPlacement[b]
+                for d in range(1,4):
+                    startingPoint.add_integer_var_solution(POSITION[(b,d)], int(position[d-1]))
+                for o in range(1,3):
+                    startingPoint.add_integer_var_solution(ORIENTATION[(b,o)], 1 if o == orientation else 0)
+        model.set_starting_point(startingPoint)
+
     # Solve model
     print("Solving model....")
     msol = model.solve(TimeLimit=10)
 
     if msol: # If the model ran successfully, it returns True 
+        placement = {}
+        for b in theBoxes:
+            placement[b] = [tuple(msol[POSITION[(b,d)]] for d in range(1,4)), 1 if msol[ORIENTATION[(b,1)]] == 1 else 2]
+        return [placement, False]
+    else: # Problem is infeasible (or the time limit was reached)
+        return [None, msol.get_solve_status() != SOLVE_STATUS_INFEASIBLE]
+
+def solvePackingSubproblem(theBoxes, boxSize, containerSize, compact=False):
+    ''' Input data
+    theBoxes: the boxes to pack into container (list)
+    boxSize: size of each box, in each of three dimensions [box, dim, orientation] (dict)
+    containerSize: size of this container, in each of three dimensions (list)
+    compact: if True, use the compact model with symmetry breaking (bool)
+    '''
+    placement, timedOut = findPacking(theBoxes, boxSize, containerSize, compact)
+    if placement is not None:
         return True
     else: # Problem is infeasible; print the infeasibility 
         # theConflictsResult = model.refine_conflict()
         # print(theConflictsResult)
         return False 
+
+if __name__ == "__main__":
+    # Benchmark CP solve time of both models on random box subsets, with boxes generated as in boxes_in_trucks.py
+    from random import sample
+    from packing_prefilter import randomBoxSizes
+    numBoxes = 30
+    boxSize = randomBoxSizes(numBoxes)
+    containerSize = [8, 8, 8]
+
+    for subsetSize in [10, 15, 20, 25, 30]:
+        theBoxes = sorted(sample(range(1, numBoxes+1), subsetSize))
+        for compact in [False, True]:
+            startTime = perf_counter()
+            if compact:
+                model, POSITION, ORIENTATION = buildCompactPackingModel(theBoxes, boxSize, containerSize)
+            else:
+                model, POSITION, ORIENTATION = buildPackingModel(theBoxes, boxSize, containerSize)
+            buildTime = perf_counter() - startTime
+            msol = model.solve(TimeLimit=60, LogVerbosity='Quiet')
+            print(str(subsetSize) + " boxes, " + ("compact" if compact else "original") + " model: " +
+                  str(len(model.get_all_expressions())) + " constraints, build " + str(round(buildTime, 4)) + " sec, solve " +
+                  str(round(msol.get_solve_time(), 4)) + " sec, " + ("feasible" if msol else "infeasible or timed out"))
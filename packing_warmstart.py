@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""
+Warm start for the packing subproblem in boxes_in_trucks.py.
+Between lazy constraint callbacks, a truck's load often differs by a box or two from a load
+already shown to fit.  So the last feasible placement is kept for each container size, and
+a new load is first packed by keeping the boxes it shares with that placement where they
+are and placing only the other boxes around them.  If that fails, the exact packer is run,
+with the shared boxes' positions given as a starting point.
+"""
+# Import
+from time import perf_counter
+
+from packing_prefilter import extremePointPack
+
+class WarmStartPacking:
+    ''' Input data
+    finder: exact packer used by isFeasible, called as finder(theBoxes, boxSize, containerSize, startingPlacement=...) and
+    returning [placement, timedOut], like findPacking in packing_subproblem.py or packing_native.py
+    (function; optional when the exact packer is run by the caller, as in boxes_in_trucks.py)
+    '''
+    def __init__(self, finder=None):
+        self.finder = finder
+        self.lastPlacement = {} # Container dimensions: last feasible placement (dict of box: [position, orientation])
+        self.numWarmPacked = 0 # Loads packed around the kept placement, without the exact packer
+        self.numSolves = 0 # Calls to the exact packer
+        self.numStarted = 0 # Calls to the exact packer given a starting point
+
+    def remember(self, theBoxes, containerSize, placement):
+        # Keep a feasible placement of these boxes for this container size
+        self.lastPlacement[tuple(containerSize)] = placement
+
+    def keptPlacement(self, theBoxes, containerSize):
+        # The part of the last feasible placement for this container size that covers these boxes
+        previous = self.lastPlacement.get(tuple(containerSize), {})
+        return {b: previous[b] for b in theBoxes if b in previous}
+
+    def quickCheck(self, theBoxes, boxSize, containerSize):
+        # True if the boxes can be packed around the kept placement, None if the exact packer is needed
+        kept = self.keptPlacement(theBoxes, containerSize)
+        if kept:
+            placement = extremePointPack(theBoxes, boxSize, containerSize, kept)
+            if placement is not None:
+                self.numWarmPacked += 1
+                self.remember(theBoxes, containerSize, placement)
+                return True
+        return None
+
+    def startingPlacement(self, theBoxes, containerSize):
+        # Starting point to give the exact packer for these boxes (None if there isn't one)
+        kept = self.keptPlacement(theBoxes, containerSize)
+        self.numSolves += 1
+        if kept:
+            self.numStarted += 1
+            return kept
+        return None
+
+    def recordSolve(self, theBoxes, containerSize, placement):
+        # Keep the exact packer's placement, if it found one; True if the boxes fit
+        if placement is None:
+            return False
+        self.remember(theBoxes, containerSize, placement)
+        return True
+
+    def isFeasible(self, theBoxes, boxSize, containerSize):
+        # Same inputs and result as solvePackingSubproblem
+        if self.quickCheck(theBoxes, boxSize, containerSize):
+            return True
+        startingPlacement = self.startingPlacement(theBoxes, containerSize)
+        placement, timedOut = self.finder(theBoxes, boxSize, containerSize, startingPlacement=startingPlacement)
+        return self.recordSolve(theBoxes, containerSize, placement)
+
+    def stats(self):
+        return "Packing warm start: " + str(self.numWarmPacked) + " loads packed around the last placement, " + \
+               str(self.numSolves) + " exact solves (" + str(self.numStarted) + " with a starting point)"
+
+if __name__ == "__main__":
+    # Loads that grow one box at a time in an 8 x 8 x 8 truck, as between successive callbacks,
+    # with and without the warm start (using the exact packer in packing_native.py)
+    from packing_native import findPacking
+    from packing_prefilter import randomBoxSizes
+    boxSize = randomBoxSizes(30)
+    containerSize = [8, 8, 8]
+    warmStart = WarmStartPacking(findPacking)
+    coldTime = 0
+    warmTime = 0
+    for numBoxes in range(1, 31):
+        theBoxes = list(range(1, numBoxes+1))
+        startTime = perf_counter()
+        placement, timedOut = findPacking(theBoxes, boxSize, containerSize)
+        coldTime += perf_counter() - startTime
+        startTime = perf_counter()
+        warmFeasible = warmStart.isFeasible(theBoxes, boxSize, containerSize)
+        warmTime += perf_counter() - startTime
+        if timedOut:
+            print("First " + str(numBoxes) + " boxes: exact packer alone reached its time limit; with warm start: " +
+                  ("feasible" if warmFeasible else "infeasible"))
+        elif (placement is not None) != warmFeasible:
+            print("ERROR: warm start disagrees on the first " + str(numBoxes) + " boxes")
+    print("Exact packer alone: " + str(round(coldTime, 4)) + " sec; with warm start: " + str(round(warmTime, 4)) + " sec")
+    print(warmStart.stats())
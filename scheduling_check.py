@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+"""
+Feasibility check for the scheduling subproblem in job_shipping_scheduling(1).py, without CPLEX.
+The CP model in scheduling_subproblem(1).py asks whether jobs of given lengths can all be done
+on identical machines (one machine per job at a time) within totalTime: the decision version
+of P||Cmax.  That is the same as packing the job lengths into availResources bins of size
+totalTime, which this module checks directly:
+ - Bounds: no job longer than totalTime, total length no more than availResources * totalTime,
+   and the Martello-Toth L2 lower bound on the number of machines needed.
+ - Heuristic: longest processing time first (LPT), each job on the least loaded machine.
+ - Exact search: jobs longest first, each tried on each machine with a distinct load, with
+   failed (job, sorted machine loads) states remembered so they aren't searched twice.
+Results are cached by (sorted job lengths, machines, time available).
+
+Job lengths are whole time blocks, as in the data files (fractional lengths are rounded up).
+"""
+# Import
+import heapq
+import math
+from time import perf_counter
+
+def roundedLengths(jobLength):
+    # Job lengths as whole time blocks, longest first
+    return sorted((int(math.ceil(length)) for length in jobLength), reverse=True)
+
+def machinesLowerBound(lengths, totalTime):
+    # Martello-Toth L2 bound: fewest machines (bins of size totalTime) that can hold these jobs (longest first)
+    bound = int(math.ceil(sum(lengths) / totalTime)) if lengths else 0
+    for k in sorted(set([0] + [length for length in lengths if length <= totalTime / 2])):
+        large = [length for length in lengths if length > totalTime - k] # Each needs a machine of its own, with no room for jobs of length k or more
+        medium = [length for length in lengths if totalTime / 2 < length <= totalTime - k] # Each needs a machine of its own
+        small = sum(length for length in lengths if k <= length <= totalTime / 2)
+        spareRoom = len(medium) * totalTime - sum(medium) # Room left next to the medium jobs
+        bound = max(bound, len(large) + len(medium) + max(0, int(math.ceil((small - spareRoom) / totalTime))))
+    return bound
+
+def lptMakespan(lengths, availResources):
+    # Makespan of the LPT schedule: each job, longest first, on the least loaded machine
+    loads = [0] * min(availResources, max(1, len(lengths)))
+    for length in lengths:
+        heapq.heapreplace(loads, loads[0] + length)
+    return max(loads)
+
+def searchSchedule(jobLength, availResources, totalTime, timeLimit=10):
+    ''' Exact check: can the jobs be split among availResources machines, each with total length at most totalTime?
+    Input data as in solveSchedulingSubproblem, plus
+    timeLimit: maximum search time in seconds (float)
+    Returns [isFeasible, timedOut].
+    '''
+    deadline = perf_counter() + timeLimit
+    lengths = roundedLengths(jobLength)
+    numMachines = min(int(availResources), len(lengths))
+    if len(lengths) > 0 and lengths[0] > totalTime:
+        return [False, False]
+    remaining = [0] * (len(lengths) + 1) # Total length of jobs k, k+1, ...
+    for k in range(len(lengths) - 1, -1, -1):
+        remaining[k] = remaining[k+1] + lengths[k]
+    loads = [0] * numMachines
+    failedStates = set()
+    numNodes = [0]
+
+    def search(k):
+        # Place jobs k, k+1, ... (loads are the current machine loads); True if all placed
+        if k == len(lengths):
+            return True
+        numNodes[0] += 1
+        if numNodes[0] % 1000 == 0 and perf_counter() > deadline:
+            raise TimeoutError()
+        usableRoom = sum(totalTime - load for load in loads if totalTime - load >= lengths[-1]) # Room that can still take a job
+        if remaining[k] > usableRoom:
+            return False
+        state = (k, tuple(sorted(loads)))
+        if state in failedStates:
+            return False
+        for i in range(numMachines): # A job that exactly fills a machine can go there without loss
+            if loads[i] + lengths[k] == totalTime:
+                loads[i] += lengths[k]
+                if search(k+1):
+                    return True
+                loads[i] -= lengths[k]
+                failedStates.add(state)
+                return False
+        triedLoads = set() # Machines with the same load are interchangeable
+        for i in range(numMachines):
+            if loads[i] in triedLoads or loads[i] + lengths[k] > totalTime:
+                continue
+            triedLoads.add(loads[i])
+            loads[i] += lengths[k]
+            if search(k+1):
+                return True
+            loads[i] -= lengths[k]
+        failedStates.add(state)
+        return False
+
+    try:
+        return [search(0), False]
+    except TimeoutError:
+        return [False, True]
+
+class ParallelMachineCheck:
+    ''' Input data
+    timeLimit: maximum exact search time per check in seconds (float)
+    '''
+    def __init__(self, timeLimit=10):
+        self.timeLimit = timeLimit
+        self.cache = {} # (sorted job lengths, machines, time available): feasible (bool)
+        self.cacheHits = 0
+        self.tierCounts = {'bounds': 0, 'LPT': 0, 'search': 0} # Number of checks decided by each tier
+
+    def cacheKey(self, totalTime, availResources, jobLength):
+        return (tuple(sorted(jobLength)), int(availResources), totalTime)
+
+    def decide(self, key, tier, isFeasible):
+        self.tierCounts[tier] += 1
+        self.cache[key] = isFeasible
+        return isFeasible
+
+    def quickCheck(self, numJobs, totalTime, availResources, jobLength):
+        # Result from the cache, bounds or LPT heuristic, or None if the exact search is needed
+        key = self.cacheKey(totalTime, availResources, jobLength)
+        if key in self.cache:
+            self.cacheHits += 1
+            return self.cache[key]
+        lengths = roundedLengths(jobLength)
+        if len(lengths) == 0:
+            return self.decide(key, 'bounds', True)
+        if lengths[0] > totalTime or sum(lengths) > availResources * totalTime or \
+           machinesLowerBound(lengths, totalTime) > availResources:
+            return self.decide(key, 'bounds', False)
+        if lptMakespan(lengths, int(availResources)) <= totalTime:
+            return self.decide(key, 'LPT', True)
+        return None
+
+    def recordSearch(self, totalTime, availResources, jobLength, isFeasible):
+        # Keep the result of an exact search (e.g. one run in another process)
+        return self.decide(self.cacheKey(totalTime, availResources, jobLength), 'search', isFeasible)
+
+    def isFeasible(self, numJobs, totalTime, availResources, jobLength):
+        # Same inputs and result as solveSchedulingSubproblem
+        isFeasible = self.quickCheck(numJobs, totalTime, availResources, jobLength)
+        if isFeasible is None:
+            isFeasible, timedOut = searchSchedule(jobLength, availResources, totalTime, self.timeLimit)
+            if timedOut: # Not proven infeasible, so don't cache it
+                print("Time limit reached; treating schedule as infeasible.")
+            else:
+                self.recordSearch(totalTime, availResources, jobLength, isFeasible)
+        return isFeasible
+
+    def stats(self):
+        return "Scheduling checks: " + str(self.cacheHits) + " cache hits; decided by each tier: " + \
+               ", ".join(tier + " " + str(count) for tier, count in self.tierCounts.items())
+
+if __name__ == "__main__":
+    # Random worksite checks, with job lengths 1-5 and 2-4 machines, for horizons around the average load
+    from random import randrange, seed
+    seed(1) # Set random seed
+    schedulingCheck = ParallelMachineCheck()
+    startTime = perf_counter()
+    numFeasible = 0
+    numChecks = 2000
+    for n in range(numChecks):
+        numJobs = randrange(1, 30)
+        availResources = randrange(2, 5)
+        jobLength = [randrange(1, 6) for j in range(numJobs)]
+        totalTime = max(1, sum(jobLength) // availResources + randrange(-1, 3))
+        numFeasible += schedulingCheck.isFeasible(numJobs, totalTime, availResources, jobLength)
+    print(str(numChecks) + " checks (" + str(numFeasible) + " feasible) in " + str(round(perf_counter() - startTime, 4)) + " sec")
+    print(schedulingCheck.stats())
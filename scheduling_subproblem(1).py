@@ -4,55 +4,140 @@ Scheduling subproblem for job shipping and scheduling problem, for one worksite.
 Checks feasibility, given number of jobs.  
 Solves using constraint programming.
 
+Three formulations are available, selected by the formulation parameter:
+ - 'pairwise': the original model, with integer TIME and RESOURCE variables and a
+   disjunction for every ordered pair of jobs
+ - 'cumulative': an interval variable for each job, and one cumulative constraint (the
+   pulses of running jobs add up to at most availResources); machines are assigned after
+   solving, since identical machines can always run any set of jobs that meets this
+ - 'machines': an interval variable for each job, an optional interval for each job on
+   each machine, one of which is chosen (alternative), and no_overlap on each machine
+Run this file directly to compare their build and solve times on growing numbers of jobs.
+
 Requirements: 
  - CPLEX (or other Pyomo-compatible solver)
 """
 
 # Import 
+import math
 from docplex.cp.model import CpoModel
+from docplex.cp.modeler import alternative, no_overlap, pulse
 from docplex.cp.solution import CpoRefineConflictResult
 from sys import stdout
+from time import perf_counter
+
+def assignMachines(startTimes, jobLength, availResources):
+    # Machine for each job, given start times that never have more than availResources jobs running:
+    # in order of start time, each job goes on the machine that has been free longest
+    machineFree = [0] * availResources # Time each machine becomes free
+    machines = [None] * len(startTimes)
+    for j in sorted(range(len(startTimes)), key=lambda j: startTimes[j]):
+        r = min(range(availResources), key=lambda r: machineFree[r])
+        machines[j] = r
+        machineFree[r] = startTimes[j] + jobLength[j]
+    return machines
+
+def buildSchedulingModel(numJobs, totalTime, availResources, jobLength, formulation='pairwise'):
+    ''' Input data as in solveSchedulingSubproblem
+    Returns [model, readSchedule], where readSchedule(msol) gives [startTimes, machines] from a solution.
+    '''
+
+    # Create a CPO model
+    model = CpoModel()
+
+    if formulation == 'pairwise':
+        # Create variables
+        TIME = model.integer_var_list(numJobs, 0, totalTime - 1, "TIME") # For each job, indicate start time
+        RESOURCE = model.integer_var_list(numJobs, 0, availResources - 1, "RESOURCE") # For each job, indicate resource used
+
+        # Add general constraints
+        for i in range(numJobs):
+            # Jobs must end before the end of the totalTime available
+            model.add(TIME[i] + jobLength[i] <= totalTime) 
+            # Jobs can't be scheduled on a machine at the same time
+            for j in range(numJobs):
+                if i != j:
+                    model.add( (RESOURCE[i] != RESOURCE[j]) | (TIME[i] + jobLength[i] <= TIME[j]) | (TIME[j] + jobLength[j] <= TIME[i]) ) 
+
+        # If there's only one job, then above constraints will never reference RESOURCE variable.
+        # In that case, RESOURCE won't show up in the problem, and won't get a value.
+        # To prevent this, we add dummy constraints on RESOURCE as follows:
+        if numJobs == 1: model.add(RESOURCE[0] >= 0)
+
+        def readSchedule(msol):
+            return [[msol[TIME[j]] for j in range(numJobs)], [msol[RESOURCE[j]] for j in range(numJobs)]]
 
-def solveSchedulingSubproblem(numJobs, totalTime, availResources, jobLength):
+    elif formulation in ['cumulative', 'machines']:
+        # Create variables: each job runs for its length (rounded up to whole time blocks, as the pairwise model's
+        # integer start times require), within the totalTime available
+        JOB = [model.interval_var(start=(0, totalTime), end=(0, totalTime), size=int(math.ceil(jobLength[j])), name="JOB_" + str(j)) for j in range(numJobs)]
+
+        if formulation == 'cumulative':
+            # At most availResources jobs running at any time
+            model.add(sum(pulse(JOB[j], 1) for j in range(numJobs)) <= availResources)
+
+            def readSchedule(msol):
+                startTimes = [msol.get_var_solution(JOB[j]).get_start() for j in range(numJobs)]
+                return [startTimes, assignMachines(startTimes, jobLength, availResources)]
+        else:
+            # Each job runs on one machine, and jobs on the same machine don't overlap
+            MACHINE = [[model.interval_var(optional=True, name="MACHINE_" + str(j) + "_" + str(r)) for r in range(availResources)] for j in range(numJobs)]
+            for j in range(numJobs):
+                model.add(alternative(JOB[j], MACHINE[j]))
+            for r in range(availResources):
+                model.add(no_overlap([MACHINE[j][r] for j in range(numJobs)]))
+
+            def readSchedule(msol):
+                startTimes = [msol.get_var_solution(JOB[j]).get_start() for j in range(numJobs)]
+                machines = [next(r for r in range(availResources) if msol.get_var_solution(MACHINE[j][r]).is_present()) for j in range(numJobs)]
+                return [startTimes, machines]
+    else:
+        raise ValueError("Unknown formulation " + str(formulation) + "; use 'pairwise', 'cumulative' or 'machines'.")
+
+    return [model, readSchedule]
+
+def solveSchedulingSubproblem(numJobs, totalTime, availResources, jobLength, formulation='pairwise'):
     ''' Input data
     numJobs: Number of jobs (int)
     totalTime: Total time blocks (int)
     availResources: Total amount of resource available for this machine.  Assume each job uses one resource. (int)
     jobLength: The length (in time blocks) of each job (list, by job number)
+    formulation: 'pairwise' (original), 'cumulative' or 'machines' (interval variables) (str)
     '''
 
     # Create a CPO model
-    model = CpoModel()
-
-    # Create variables
-    TIME = model.integer_var_list(numJobs, 0, totalTime - 1, "TIME") # For each job, indicate start time
-    RESOURCE = model.integer_var_list(numJobs, 0, availResources - 1, "RESOURCE") # For each job, indicate resource used
-
-    # Add general constraints
-    for i in range(numJobs):
-        # Jobs must end before the end of the totalTime available
-        model.add(TIME[i] + jobLength[i] <= totalTime) 
-        # Jobs can't be scheduled on a machine at the same time
-        for j in range(numJobs):
-            if i != j:
-                model.add( (RESOURCE[i] != RESOURCE[j]) | (TIME[i] + jobLength[i] <= TIME[j]) | (TIME[j] + jobLength[j] <= TIME[i]) ) 
-
-    # If there's only one job, then above constraints will never reference RESOURCE variable.
-    # In that case, RESOURCE won't show up in the problem, and won't get a value.
-    # To prevent this, we add dummy constraints on RESOURCE as follows:
-    if numJobs == 1: model.add(RESOURCE[0] >= 0)
+    model, readSchedule = buildSchedulingModel(numJobs, totalTime, availResources, jobLength, formulation)
 
     # Solve model
     print("Solving model....")
     msol = model.solve(TimeLimit=10)
 
     if msol: # If the model ran successfully, it returns True 
+        startTimes, machines = readSchedule(msol)
         print("Solution:")
         for j in range(numJobs):
-            print("Job " + str(j) + " starts at time " + str(msol[TIME[j]]) + " and uses resource " + str(msol[RESOURCE[j]]))
-        print("Last job time ends at " + str(max(msol[TIME[j]] + jobLength[j] for j in range(numJobs))) )
+            print("Job " + str(j) + " starts at time " + str(startTimes[j]) + " and uses resource " + str(machines[j]))
+        print("Last job time ends at " + str(max(startTimes[j] + jobLength[j] for j in range(numJobs))) )
         return True
     else: # Problem is infeasible; print the infeasibility 
         # theConflictsResult = model.refine_conflict()
         # print(theConflictsResult)
         return False 
+
+if __name__ == "__main__":
+    # Benchmark build and solve time of each formulation on growing numbers of jobs, with job lengths 1-5,
+    # 4 machines, and just enough time for the total length (so most instances are tight)
+    from random import randrange, seed
+    seed(1) # Set random seed
+    availResources = 4
+    for numJobs in [10, 20, 40, 80, 160]:
+        jobLength = [randrange(1, 6) for j in range(numJobs)]
+        totalTime = max(max(jobLength), -(-sum(jobLength) // availResources))
+        for formulation in ['pairwise', 'cumulative', 'machines']:
+            startTime = perf_counter()
+            model, readSchedule = buildSchedulingModel(numJobs, totalTime, availResources, jobLength, formulation)
+            buildTime = perf_counter() - startTime
+            msol = model.solve(TimeLimit=60, LogVerbosity='Quiet')
+            print(str(numJobs) + " jobs, " + formulation + " model: " + str(len(model.get_all_expressions())) + " constraints, build " +
+                  str(round(buildTime, 4)) + " sec, solve " + str(round(msol.get_solve_time(), 4)) + " sec, " +
+                  ("feasible" if msol else "infeasible or timed out"))
@@ -0,0 +1,437 @@
+# -*- coding: utf-8 -*-
+"""
+Network data helpers for job_shipping_scheduling(1).py.
+
+Loading: the dense node x node cost and capacity CSVs are turned into arc lists with NumPy
+masks (cost >= 0, capacity > 0, not a self-loop), and the per-job arcs are expanded with
+array operations instead of nested loops.  The parsed instance is saved as a compressed .npz
+file named by a hash of the input files, so later runs with the same files skip the CSVs.
+For large, sparse networks the arcs can instead be given as an edge list (a CSV with columns
+from,to,cost,capacity and one row per arc, nodes numbered from 1), which is read in chunks so
+memory grows with the number of arcs rather than with numNodes squared.
+
+Adjacency indexes: each constraint in the job shipping model sums FLOW over a slice of the
+arcs (arcs out of a node for one job, arcs into a node for one job, arcs between two nodes,
+arcs into a worksite for one job).  Scanning every arc for every constraint makes the model
+build O(constraints * arcs); building the slices once, in one pass over the arcs, lets each
+constraint rule visit only its own arcs.
+
+Pruning: job k can only be useful on arc i->j if i can be reached from k's supply node and
+a worksite can be reached from j, moving through transshipment nodes (jobs stop at the first
+worksite they enter, and arcs out of other supply nodes don't carry job k).  Shortest path
+distances (Dijkstra) give this, and also a lower bound on the cost of any solution that sends
+job k along arc i->j: arcs whose bound exceeds the cost of a known solution can be dropped.
+
+Aggregation: arc costs and capacities don't depend on the job, so the jobs of one supply node
+can share their arcs, as one commodity, in the aggregated formulation.
+
+Run this file directly to time constraint construction with and without the indexes (and,
+if Pyomo is installed, building the model's constraints with the original and indexed rules),
+loading from dense CSVs, from an edge list and from the cache, and to count the arcs pruning
+removes and the variables in the aggregated formulation, on synthetic networks.
+"""
+# Import
+import hashlib
+import heapq
+import os
+import numpy as np
+import pandas as pd # For importing data from csv files
+from random import randrange, sample, seed
+from time import perf_counter
+
+edgeListColumns = ['from', 'to', 'cost', 'capacity'] # Header of an edge list file
+
+def buildArcIndexes(arcs, worksiteNodes):
+    ''' Input data
+    arcs: (i, j, k) for each arc i->j that job k may use (list)
+    worksiteNodes: the worksite nodes (list)
+    Returns [outArcs, inArcs, pairArcs, worksiteArcs]:
+     outArcs: arcs leaving node i for job k, by (i, k) (dict)
+     inArcs: arcs entering node j for job k, by (j, k) (dict)
+     pairArcs: arcs from node i to node j, for every job, by (i, j) (dict)
+     worksiteArcs: arcs bringing job k into a worksite, by k (dict)
+    '''
+    worksites = set(worksiteNodes)
+    outArcs = {}
+    inArcs = {}
+    pairArcs = {}
+    worksiteArcs = {}
+    for arc in arcs:
+        i, j, k = arc
+        outArcs.setdefault((i,k), []).append(arc)
+        inArcs.setdefault((j,k), []).append(arc)
+        pairArcs.setdefault((i,j), []).append(arc)
+        if j in worksites:
+            worksiteArcs.setdefault(k, []).append(arc)
+    return [outArcs, inArcs, pairArcs, worksiteArcs]
+
+def aggregateArcs(arcs, supply):
+    # Arcs (i, j, s) for the jobs of supply node s together, from the job arcs (i, j, k), in the order first seen
+    origin = {k: i for i in supply for k in supply[i]}
+    return list(dict.fromkeys((i, j, origin[k]) for (i, j, k) in arcs))
+
+def shortestDistances(sources, neighbors, passable):
+    ''' Dijkstra from several sources
+    sources: nodes to start from, at distance 0 (list)
+    neighbors: for each node, [(next node, arc cost), ...] (dict)
+    passable: nodes that paths may continue through, besides the sources (set)
+    Returns the distance to each node reached (dict).
+    '''
+    sourceSet = set(sources)
+    distance = {node: 0.0 for node in sources}
+    queue = [(0.0, node) for node in sources]
+    heapq.heapify(queue)
+    while queue:
+        theDistance, node = heapq.heappop(queue)
+        if theDistance > distance[node] or (node not in sourceSet and node not in passable): # Stale entry, or a node paths end at
+            continue
+        for nextNode, cost in neighbors.get(node, []):
+            if theDistance + cost < distance.get(nextNode, float('inf')):
+                distance[nextNode] = theDistance + cost
+                heapq.heappush(queue, (theDistance + cost, nextNode))
+    return distance
+
+def pruneArcs(arcs, costs, supply, worksiteNodes, transshipmentNodes, incumbentCost=None):
+    ''' Input data
+    arcs: (i, j, k) for each arc i->j that job k may use (list)
+    costs: cost of each arc, by (i, j) (dict)
+    supply: the jobs at each supply node (dict)
+    worksiteNodes: the worksite nodes (list)
+    transshipmentNodes: the transshipment nodes (list)
+    incumbentCost: cost of a known solution; arcs only in costlier solutions are dropped (float; default: no cost pruning)
+    Returns the arcs that can be on a path from their job's supply node to a worksite, in their original order (list).
+    '''
+    worksites = set(worksiteNodes)
+    transshipment = set(transshipmentNodes)
+    origin = {k: i for i in supply for k in supply[i]}
+    forwardNeighbors = {}
+    backwardNeighbors = {}
+    for (i,j) in costs:
+        forwardNeighbors.setdefault(i, []).append((j, costs[i,j]))
+        backwardNeighbors.setdefault(j, []).append((i, costs[i,j]))
+    toWorksite = shortestDistances(worksiteNodes, backwardNeighbors, transshipment) # Cheapest way on from each node to a worksite
+    fromSupply = {i: shortestDistances([i], forwardNeighbors, transshipment) for i in supply} # Cheapest way to each node from each supply node
+
+    # A solution sending job k along arc i->j costs at least its cheapest path through that arc, plus each other job's cheapest path
+    shortestPath = {i: min([fromSupply[i][j] for j in worksiteNodes if j in fromSupply[i]], default=float('inf')) for i in supply}
+    for i in supply:
+        if shortestPath[i] == float('inf'):
+            print("ERROR: No worksite can be reached from supply node " + str(i) + ".")
+    lowerBound = sum(shortestPath[i] * len(supply[i]) for i in supply)
+
+    keptArcs = []
+    for arc in arcs:
+        i, j, k = arc
+        reached = fromSupply[origin[k]]
+        if i not in reached or (i != origin[k] and i not in transshipment): # Job k can't be at node i and leaving it
+            continue
+        if j not in toWorksite or (j not in worksites and j not in transshipment): # Job k can't get from node j to a worksite
+            continue
+        if incumbentCost is not None and \
+           lowerBound - shortestPath[origin[k]] + reached[i] + costs[i,j] + toWorksite[j] > incumbentCost + 1e-9:
+            continue
+        keptArcs.append(arc)
+    return keptArcs
+
+def syntheticNetwork(numNodes, outDegree=4):
+    ''' Random job shipping instance, in the form returned by importData in job_shipping_scheduling(1).py
+    numNodes: number of nodes (int); about 5% are supply nodes and 10% worksites
+    outDegree: number of arcs out of each node (int)
+    '''
+    seed(1) # Set random seed
+    nodes = [*range(1, numNodes+1)]
+    supplyNodes = nodes[:max(1, numNodes // 20)]
+    worksiteNodes = nodes[len(supplyNodes):len(supplyNodes) + max(1, numNodes // 10)]
+    transshipmentNodes = nodes[len(supplyNodes) + len(worksiteNodes):]
+    numJobs = 0
+    supply = {}
+    supplyJobArcs = []
+    for i in supplyNodes:
+        supply[i] = [*range(numJobs + 1, numJobs + 1 + randrange(1, 4))]
+        supplyJobArcs += [(i, k) for k in supply[i]]
+        numJobs += len(supply[i])
+    numMachines = {i: float(randrange(1, 4)) for i in worksiteNodes}
+    jobLengths = {k: float(randrange(1, 6)) for k in range(1, numJobs+1)}
+
+    costs = {}
+    capacities = {}
+    arcs = []
+    for i in nodes:
+        for j in sample([n for n in nodes if n != i], outDegree):
+            costs[i,j] = float(randrange(1, 10))
+            capacities[i,j] = float(randrange(1, 6))
+            if i in supply: # If this is a supply node
+                for k in supply[i]: arcs.append((i,j,k)) # Add index for jobs associated with this supply node
+            else: # Not a supply node; add arcs for all jobs
+                for k in range(1, numJobs+1): arcs.append((i,j,k)) # Add index for jobs
+    return [supplyNodes, supplyJobArcs, worksiteNodes, transshipmentNodes, numJobs, supply, numMachines, jobLengths, costs, capacities, arcs]
+
+def writeInstanceFiles(instance, folder, edgeList=False):
+    # Write an instance (as returned by syntheticNetwork) as the CSV files read by importData; returns their names.
+    # Arcs go in dense cost and capacity matrices, or (if edgeList) in one edge list, with None for the capacity file.
+    supplyNodes, supplyJobArcs, worksiteNodes, transshipmentNodes, numJobs, supply, numMachines, jobLengths, costs, capacities, arcs = instance
+    numNodes = len(supplyNodes) + len(worksiteNodes) + len(transshipmentNodes)
+    supplyCounts = np.zeros(numNodes)
+    for i in supply: supplyCounts[i-1] = len(supply[i])
+    machines = np.zeros(numNodes)
+    for i in numMachines: machines[i-1] = numMachines[i]
+    fileNames = [os.path.join(folder, name) for name in ["supplyData.csv", "worksiteData.csv", "jobData.csv"]]
+    for fileName, values in zip(fileNames, [supplyCounts, machines, [jobLengths[k] for k in range(1, numJobs+1)]]):
+        pd.DataFrame(values).to_csv(fileName, header=False, index=False)
+    if edgeList:
+        fileNames += [os.path.join(folder, "arcData.csv"), None]
+        pd.DataFrame([(i, j, costs[i,j], capacities[i,j]) for (i,j) in costs], columns=edgeListColumns).to_csv(fileNames[3], index=False)
+    else:
+        cost = -np.ones((numNodes, numNodes)) # Negative cost: no arc
+        capacity = np.zeros((numNodes, numNodes))
+        for (i,j) in costs:
+            cost[i-1,j-1] = costs[i,j]
+            capacity[i-1,j-1] = capacities[i,j]
+        fileNames += [os.path.join(folder, "costData.csv"), os.path.join(folder, "capacityData.csv")]
+        for fileName, values in zip(fileNames[3:], [cost, capacity]):
+            pd.DataFrame(values).to_csv(fileName, header=False, index=False)
+    return fileNames
+
+def fileHash(fileName):
+    # SHA-256 of a file's contents
+    theHash = hashlib.sha256()
+    with open(fileName, 'rb') as theFile:
+        for block in iter(lambda: theFile.read(1 << 20), b''):
+            theHash.update(block)
+    return theHash.hexdigest()
+
+def readEdgeList(edgeListFileName, numNodes, chunkSize=1000000):
+    # Read an edge list (from,to,cost,capacity) in chunks of rows; returns [arcFrom, arcTo, arcCost, arcCapacity], 0-based and in row-major order
+    chunks = []
+    for chunk in pd.read_csv(edgeListFileName, usecols=edgeListColumns, chunksize=chunkSize):
+        arcFrom = chunk['from'].values.astype(np.int64) - 1
+        arcTo = chunk['to'].values.astype(np.int64) - 1
+        arcCost = chunk['cost'].values.astype(float)
+        arcCapacity = chunk['capacity'].values.astype(float)
+        keep = (arcCost >= 0) & (arcCapacity > 0) & (arcFrom != arcTo) & (arcFrom >= 0) & (arcTo >= 0) & (arcFrom < numNodes) & (arcTo < numNodes)
+        chunks.append([arcFrom[keep], arcTo[keep], arcCost[keep], arcCapacity[keep]])
+    if len(chunks) == 0:
+        return [np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0), np.zeros(0)]
+    arcFrom, arcTo, arcCost, arcCapacity = [np.concatenate(column) for column in zip(*chunks)]
+    # Sort as the dense matrices are read (row by row); if an arc is listed twice, its last row wins, as in a matrix cell
+    order = np.lexsort((np.arange(arcFrom.size), arcTo, arcFrom))
+    arcFrom, arcTo, arcCost, arcCapacity = arcFrom[order], arcTo[order], arcCost[order], arcCapacity[order]
+    last = np.ones(arcFrom.size, dtype=bool)
+    last[:-1] = (arcFrom[1:] != arcFrom[:-1]) | (arcTo[1:] != arcTo[:-1])
+    if not last.all():
+        print("ERROR: " + str(int((~last).sum())) + " arcs are listed more than once in " + edgeListFileName + "; using the last row for each.")
+    return [arcFrom[last], arcTo[last], arcCost[last], arcCapacity[last]]
+
+def readInstanceArrays(supplyDataFileName, worksiteFileName, jobDataFileName, costDataFileName, capacityDataFileName, numNodes, chunkSize=1000000):
+    # Read the CSV files into arrays: jobs at each node, machines at each node, job lengths, and the arcs with their costs and capacities.
+    # If capacityDataFileName is None, costDataFileName is an edge list, read chunkSize rows at a time.
+    supplyCounts = pd.read_csv(supplyDataFileName, header=None).values[:numNodes, 0].astype(np.int64)
+    machines = pd.read_csv(worksiteFileName, header=None).values[:numNodes, 0].astype(float)
+    numJobs = int(supplyCounts[supplyCounts > 0].sum())
+    jobLengthArray = pd.read_csv(jobDataFileName, header=None).values[:numJobs, 0].astype(float)
+    if capacityDataFileName is None:
+        arcFrom, arcTo, arcCost, arcCapacity = readEdgeList(costDataFileName, numNodes, chunkSize)
+    else:
+        cost = pd.read_csv(costDataFileName, header=None).values[:numNodes, :numNodes].astype(float)
+        capacity = pd.read_csv(capacityDataFileName, header=None).values[:numNodes, :numNodes].astype(float)
+        arcFrom, arcTo = np.nonzero((cost >= 0) & (capacity > 0) & ~np.eye(numNodes, dtype=bool)) # Row by row, as the nested loops did
+        arcCost = cost[arcFrom, arcTo]
+        arcCapacity = capacity[arcFrom, arcTo]
+    return {'supplyCounts': supplyCounts, 'machines': machines, 'jobLengths': jobLengthArray,
+            'arcFrom': arcFrom, 'arcTo': arcTo, 'arcCost': arcCost, 'arcCapacity': arcCapacity}
+
+def expandInstance(arrays):
+    ''' Turn instance arrays (from readInstanceArrays) into the data structures returned by importData:
+    [supplyNodes, supplyJobArcs, worksiteNodes, transshipmentNodes, numJobs, supply, numMachines, jobLengths, costs, capacities, arcs]
+    '''
+    supplyCounts = np.maximum(arrays['supplyCounts'], 0)
+    machines = arrays['machines']
+    nodes = np.arange(1, supplyCounts.size + 1)
+    numJobs = int(supplyCounts.sum())
+    firstJob = np.cumsum(supplyCounts) - supplyCounts + 1 # First job at each supply node (jobs are numbered by node)
+
+    supplyNodes = nodes[supplyCounts > 0].tolist()
+    supply = {i: [*range(int(firstJob[i-1]), int(firstJob[i-1] + supplyCounts[i-1]))] for i in supplyNodes}
+    supplyJobArcs = [(i, k) for i in supplyNodes for k in supply[i]]
+    worksiteNodes = nodes[machines > 0].tolist()
+    numMachines = {i: float(machines[i-1]) for i in worksiteNodes}
+    transshipmentNodes = nodes[(supplyCounts <= 0) & (machines <= 0)].tolist()
+    jobLengths = {k: float(length) for k, length in zip(range(1, numJobs+1), arrays['jobLengths']) if length > 0}
+
+    arcFrom = arrays['arcFrom']
+    arcTo = arrays['arcTo']
+    costs = dict(zip(zip((arcFrom + 1).tolist(), (arcTo + 1).tolist()), arrays['arcCost'].tolist()))
+    capacities = dict(zip(zip((arcFrom + 1).tolist(), (arcTo + 1).tolist()), arrays['arcCapacity'].tolist()))
+
+    # Arcs out of a supply node carry only that node's jobs; other arcs carry every job
+    fromSupply = supplyCounts[arcFrom] > 0
+    jobsOnArc = np.where(fromSupply, supplyCounts[arcFrom], numJobs)
+    firstJobOnArc = np.where(fromSupply, firstJob[arcFrom], 1)
+    arcOfEntry = np.repeat(np.arange(arcFrom.size), jobsOnArc)
+    entryOffset = np.arange(arcOfEntry.size) - np.repeat(np.cumsum(jobsOnArc) - jobsOnArc, jobsOnArc)
+    arcs = list(zip((arcFrom[arcOfEntry] + 1).tolist(), (arcTo[arcOfEntry] + 1).tolist(), (firstJobOnArc[arcOfEntry] + entryOffset).tolist()))
+    return [supplyNodes, supplyJobArcs, worksiteNodes, transshipmentNodes, numJobs, supply, numMachines, jobLengths, costs, capacities, arcs]
+
+def loadInstance(supplyDataFileName, worksiteFileName, jobDataFileName, costDataFileName, capacityDataFileName, numNodes, cacheDir=None, chunkSize=1000000):
+    ''' Input data: as in importData (capacityDataFileName None means costDataFileName is an edge list), plus
+    cacheDir: folder for the cached .npz copy of the instance (str; default: the folder of the cost data file)
+    chunkSize: rows of an edge list read at a time (int)
+    Returns the data structures returned by importData.
+    '''
+    fileNames = [supplyDataFileName, worksiteFileName, jobDataFileName, costDataFileName, capacityDataFileName]
+    key = hashlib.sha256((" ".join(fileHash(fileName) if fileName is not None else "edges" for fileName in fileNames) + " " + str(numNodes)).encode()).hexdigest()
+    if cacheDir is None:
+        cacheDir = os.path.dirname(os.path.abspath(costDataFileName))
+    cacheFileName = os.path.join(cacheDir, "instance_" + key[:16] + ".npz")
+    if os.path.exists(cacheFileName):
+        print("Loading cached instance " + cacheFileName + "...")
+        with np.load(cacheFileName) as cached:
+            arrays = {name: cached[name] for name in cached.files}
+    else:
+        arrays = readInstanceArrays(supplyDataFileName, worksiteFileName, jobDataFileName, costDataFileName, capacityDataFileName, numNodes, chunkSize)
+        np.savez_compressed(cacheFileName, **arrays)
+    return expandInstance(arrays)
+
+if __name__ == "__main__":
+    # Time collecting each constraint's arcs, as the constraint rules do, by scanning all arcs and from the indexes.
+    # Scanning is timed on a sample of constraints and scaled up to all of them.
+    numSampled = 5 # Constraints of each kind timed when scanning
+    for numNodes in [100, 300, 1000]:
+        supplyNodes, supplyJobArcs, worksiteNodes, transshipmentNodes, numJobs, supply, numMachines, jobLengths, costs, capacities, arcs = \
+            syntheticNetwork(numNodes)
+        worksites = set(worksiteNodes)
+        constraintIndexes = {'capacity': list(capacities),
+                             'job out': supplyJobArcs,
+                             'job in': [*range(1, numJobs+1)],
+                             'balance': [(i,k) for i in transshipmentNodes for k in range(1, numJobs+1)]}
+        scans = {'capacity': lambda i, j: [a for a in arcs if a[0] == i and a[1] == j],
+                 'job out': lambda i, k: [a for a in arcs if a[0] == i and a[2] == k],
+                 'job in': lambda k: [a for a in arcs if a[1] in worksites and a[2] == k],
+                 'balance': lambda i, k: [a for a in arcs if a[0] == i and a[2] == k] + [a for a in arcs if a[1] == i and a[2] == k]}
+
+        startTime = perf_counter()
+        outArcs, inArcs, pairArcs, worksiteArcs = buildArcIndexes(arcs, worksiteNodes)
+        indexTime = perf_counter() - startTime
+        slices = {'capacity': lambda i, j: pairArcs.get((i,j), []),
+                  'job out': lambda i, k: outArcs.get((i,k), []),
+                  'job in': lambda k: worksiteArcs.get(k, []),
+                  'balance': lambda i, k: outArcs.get((i,k), []) + inArcs.get((i,k), [])}
+
+        scanTime = 0
+        sliceTime = 0
+        for kind in constraintIndexes:
+            indexes = [index if isinstance(index, tuple) else (index,) for index in constraintIndexes[kind]]
+            startTime = perf_counter()
+            for index in indexes:
+                slices[kind](*index)
+            sliceTime += perf_counter() - startTime
+            startTime = perf_counter()
+            for index in indexes[:numSampled]:
+                scans[kind](*index)
+            scanTime += (perf_counter() - startTime) * len(indexes) / max(1, min(numSampled, len(indexes)))
+        numConstraints = sum(len(indexes) for indexes in constraintIndexes.values())
+        print(str(numNodes) + " nodes, " + str(numJobs) + " jobs, " + str(len(arcs)) + " arcs, " + str(numConstraints) + " constraints: " +
+              "scanning about " + str(round(scanTime, 1)) + " sec; indexes " + str(round(indexTime, 4)) + " sec to build, " +
+              str(round(sliceTime, 4)) + " sec to use")
+
+    # Time building the model's four kinds of constraints in Pyomo, with the original rules (scanning all arcs)
+    # and with rules using the indexes.  Needs Pyomo; without it, the timings above stand in for this.
+    try:
+        from pyomo.environ import Binary, ConcreteModel, Constraint, Param, Set, Var
+    except ImportError:
+        print("Pyomo is not installed; skipping the model build benchmark.")
+    else:
+        for numNodes in [100, 300, 1000]:
+            supplyNodes, supplyJobArcs, worksiteNodes, transshipmentNodes, numJobs, supply, numMachines, jobLengths, costs, capacities, arcs = \
+                syntheticNetwork(numNodes)
+            buildTimes = {}
+            for indexed in [False, True]:
+                if not indexed and numNodes > 300: # Scanning takes too long here
+                    continue
+                startTime = perf_counter()
+                model = ConcreteModel()
+                model.i = Set(initialize=[*range(1, numNodes+1)], ordered=True)
+                model.k = Set(initialize=[*range(1, numJobs+1)], ordered=True)
+                model.worksiteNodes = Set(within=model.i, initialize=worksiteNodes)
+                model.transshipmentNodes = Set(within=model.i, initialize=transshipmentNodes)
+                model.arcs = Set(within=model.i * model.i * model.k, initialize=arcs)
+                model.supplyJobArcs = Set(within=model.i * model.k, initialize=supplyJobArcs)
+                model.FLOW = Var(model.arcs, domain=Binary, initialize=0)
+                model.capacities = Param(model.i * model.i, initialize=capacities)
+                if indexed: # The rules in job_shipping_scheduling(1).py
+                    outArcs, inArcs, pairArcs, worksiteArcs = buildArcIndexes(arcs, worksiteNodes)
+                    arcCapacity_rule = lambda model, i, j: Constraint.Skip if (i,j) not in model.capacities or (i,j) not in pairArcs else \
+                        sum(model.FLOW[a] for a in pairArcs[i,j]) <= model.capacities[i,j]
+                    eachJobOut_rule = lambda model, i, k: sum(model.FLOW[a] for a in outArcs.get((i,k), [])) == 1
+                    eachJobIn_rule = lambda model, k: sum(model.FLOW[a] for a in worksiteArcs.get(k, [])) == 1
+                    bof_rule = lambda model, i, k: Constraint.Skip if (i,k) not in outArcs and (i,k) not in inArcs else \
+                        sum(model.FLOW[a] for a in outArcs.get((i,k), [])) - sum(model.FLOW[a] for a in inArcs.get((i,k), [])) == 0
+                else: # The original rules
+                    arcCapacity_rule = lambda model, i, j: Constraint.Skip if (i,j) not in model.capacities else \
+                        sum(model.FLOW[m,n,k] for (m,n,k) in model.arcs if m == i if n == j) <= model.capacities[i,j]
+                    eachJobOut_rule = lambda model, i, k: sum(model.FLOW[m,j,t] for (m,j,t) in model.arcs if m == i if t == k) == 1
+                    eachJobIn_rule = lambda model, k: sum(model.FLOW[i,j,t] for (i,j,t) in model.arcs if j in model.worksiteNodes if t == k) == 1
+                    bof_rule = lambda model, i, k: sum(model.FLOW[m,j,t] for (m,j,t) in model.arcs if m == i if t == k) - \
+                        sum(model.FLOW[j,m,t] for (j,m,t) in model.arcs if m == i if t == k) == 0
+                model.arcCapacityConstraint = Constraint(model.i, model.i, rule=arcCapacity_rule)
+                model.jobOutConstraint = Constraint(model.supplyJobArcs, rule=eachJobOut_rule)
+                model.jobInConstraint = Constraint(model.k, rule=eachJobIn_rule)
+                model.bofConstraint = Constraint(model.transshipmentNodes, model.k, rule=bof_rule)
+                buildTimes[indexed] = perf_counter() - startTime
+            print(str(numNodes) + " nodes: Pyomo model built in " +
+                  (str(round(buildTimes[False], 2)) + " sec with the original rules, " if False in buildTimes else "") +
+                  str(round(buildTimes[True], 2)) + " sec with the indexes")
+
+    # Time loading the arcs from dense CSV files and from an edge list, the first time (parsing them) and again
+    # (from the cached .npz file), and check that both give the same instance
+    import tempfile
+    for numNodes in [100, 300, 1000]:
+        instance = syntheticNetwork(numNodes)
+        loaded = {}
+        for edgeList in [False, True]:
+            with tempfile.TemporaryDirectory() as folder:
+                fileNames = writeInstanceFiles(instance, folder, edgeList)
+                fileSize = sum(os.path.getsize(fileName) for fileName in fileNames[3:] if fileName is not None)
+                loadTimes = []
+                for attempt in range(2):
+                    startTime = perf_counter()
+                    loaded[edgeList] = loadInstance(*fileNames, numNodes, chunkSize=10000)
+                    loadTimes.append(perf_counter() - startTime)
+            print(str(numNodes) + " nodes, " + ("edge list" if edgeList else "dense matrices") + " (" + str(round(fileSize / 1e6, 2)) + " MB): loaded from CSV in " +
+                  str(round(loadTimes[0], 4)) + " sec, from cache in " + str(round(loadTimes[1], 4)) + " sec")
+        if loaded[False] != loaded[True] or loaded[True][8] != instance[8] or sorted(loaded[True][10]) != sorted(instance[10]):
+            print("ERROR: the edge list and dense matrices give different instances")
+
+    # Count the FLOW variables left after pruning by reachability, and also by cost against a solution
+    # assumed to cost 5% more than the lower bound (every job on its cheapest path, ignoring capacities)
+    for numNodes in [100, 300, 1000]:
+        supplyNodes, supplyJobArcs, worksiteNodes, transshipmentNodes, numJobs, supply, numMachines, jobLengths, costs, capacities, arcs = \
+            syntheticNetwork(numNodes)
+        forwardNeighbors = {}
+        for (i,j) in costs: forwardNeighbors.setdefault(i, []).append((j, costs[i,j]))
+        lowerBound = 0
+        for i in supply:
+            reached = shortestDistances([i], forwardNeighbors, set(transshipmentNodes))
+            lowerBound += len(supply[i]) * min(reached[j] for j in worksiteNodes if j in reached)
+        counts = []
+        for incumbentCost in [None, 1.05 * lowerBound]:
+            startTime = perf_counter()
+            counts.append(len(pruneArcs(arcs, costs, supply, worksiteNodes, transshipmentNodes, incumbentCost)))
+            pruneTime = perf_counter() - startTime
+        print(str(numNodes) + " nodes: " + str(len(arcs)) + " FLOW variables; " + str(counts[0]) + " after reachability pruning (" +
+              str(round(100 * (1 - counts[0] / len(arcs)), 1)) + "% fewer), " + str(counts[1]) + " also pruning by cost (" +
+              str(round(100 * (1 - counts[1] / len(arcs)), 1)) + "% fewer, " + str(round(pruneTime, 4)) + " sec)")
+
+    # Count the variables in the aggregated formulation (a FLOW variable for each supply node's jobs on each arc,
+    # and an ASSIGN variable for each job and worksite it can reach) against a FLOW variable for each job, after pruning
+    for numNodes in [100, 300, 1000]:
+        for outDegree in [4, 16]:
+            supplyNodes, supplyJobArcs, worksiteNodes, transshipmentNodes, numJobs, supply, numMachines, jobLengths, costs, capacities, arcs = \
+                syntheticNetwork(numNodes, outDegree)
+            arcs = pruneArcs(arcs, costs, supply, worksiteNodes, transshipmentNodes)
+            commodityArcs = aggregateArcs(arcs, supply)
+            worksites = set(worksiteNodes)
+            numAssignments = sum(len(supply[s]) for (j,s) in set((j,s) for (i,j,s) in commodityArcs if j in worksites))
+            print(str(numNodes) + " nodes, " + str(outDegree) + " arcs out of each: " + str(len(arcs)) + " job FLOW variables; aggregated, " +
+                  str(len(commodityArcs)) + " FLOW and " + str(numAssignments) + " ASSIGN variables (" +
+                  str(round(len(arcs) / (len(commodityArcs) + numAssignments), 1)) + " times fewer)")
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""
+Persistent pool of worker processes for solving independent subproblems in parallel,
+e.g. the packing check for each truck in boxes_in_trucks.py, or the scheduling check for
+each worksite in job_shipping_scheduling(1).py.  The pool is created once, before the
+solve, so worker start-up is paid once rather than in every lazy constraint callback.
+A callback sends all of its subproblems together and waits for the slowest one.
+
+Subproblem functions must be defined at the top level of an importable module (such as
+solvePackingSubproblem), so that they can be sent to the workers.
+
+Workers use the platform's default start method.  Where that is spawn (e.g. Windows), each
+worker imports the calling script, so the script must start its solve only under
+if __name__ == "__main__": (as boxes_in_trucks.py and job_shipping_scheduling(1).py do).
+"""
+# Import
+import multiprocessing
+import os
+from time import perf_counter
+
+class SubproblemPool:
+    ''' Input data
+    numWorkers: number of worker processes (int; default: one per CPU)
+    '''
+    def __init__(self, numWorkers=None):
+        self.numWorkers = numWorkers if numWorkers is not None else os.cpu_count()
+        self.pool = multiprocessing.Pool(self.numWorkers) # Workers start now, once
+        self.numBatches = 0
+        self.numTasks = 0
+        self.largestBatch = 0
+        self.batchTime = 0 # Total wall time waiting for batches (sec)
+
+    def solveAll(self, solver, tasks):
+        ''' Solve a batch of subproblems in parallel
+        solver: top-level function to call (function)
+        tasks: arguments for each call, as [args, kwargs] (list of [tuple, dict])
+        Returns the results, in the order of tasks.
+        '''
+        if len(tasks) == 0:
+            return []
+        startTime = perf_counter()
+        asyncResults = [self.pool.apply_async(solver, args, kwargs) for args, kwargs in tasks]
+        results = [asyncResult.get() for asyncResult in asyncResults]
+        self.numBatches += 1
+        self.numTasks += len(tasks)
+        self.largestBatch = max(self.largestBatch, len(tasks))
+        self.batchTime += perf_counter() - startTime
+        return results
+
+    def stats(self):
+        return "Subproblem pool: " + str(self.numTasks) + " subproblems in " + str(self.numBatches) + " batches on " + \
+               str(self.numWorkers) + " workers (largest batch " + str(self.largestBatch) + ", " + str(round(self.batchTime, 2)) + " sec)"
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+
+if __name__ == "__main__":
+    # Time a batch of packing checks in 8 x 8 x 8 trucks one after another and in the pool,
+    # using the exact packer in packing_native.py
+    from random import sample
+    from packing_native import findPacking
+    from packing_prefilter import randomBoxSizes
+    boxSize = randomBoxSizes(40)
+    tasks = [[(sorted(sample(range(1, 41), 26)), boxSize, [8, 8, 8]), {'timeLimit': 2}] for t in range(8)]
+
+    startTime = perf_counter()
+    sequentialResults = [findPacking(*args, **kwargs)[0] is not None for args, kwargs in tasks]
+    sequentialTime = perf_counter() - startTime
+    subproblemPool = SubproblemPool()
+    startTime = perf_counter()
+    parallelResults = [placement is not None for placement, timedOut in subproblemPool.solveAll(findPacking, tasks)]
+    parallelTime = perf_counter() - startTime
+    subproblemPool.close()
+    if sequentialResults != parallelResults:
+        print("ERROR: parallel results differ from sequential results")
+    print(str(len(tasks)) + " packing checks: " + str(round(sequentialTime, 4)) + " sec one after another, " +
+          str(round(parallelTime, 4)) + " sec in the pool")
+    print(subproblemPool.stats())
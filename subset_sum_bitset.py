@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+"""
+Bitset engine for subset-sum (knapsack feasibility) questions: which total weights can
+be reached by some selection of items, and can a total of exactly W be reached?
+This only needs one bit per capacity instead of the value table in dp_knapsack_example (1).py,
+and adding an item is a single shift-and-or over the whole bitset, one machine word at a time.
+
+Two bitset representations are available: a Python big integer, or packed NumPy uint64 words.
+Items that may be chosen several times (like the available counts in budget_example_2(1).py)
+are handled by binary splitting into 0-1 items.
+"""
+# Import
+import numpy as np
+from time import perf_counter
+
+def shiftOrWords(words, shift):
+    ''' Return words | (words << shift), for a bitset stored as packed uint64 words
+    words: bitset, with bit b in words[b // 64] at position b % 64 (numpy uint64 array)
+    shift: number of bits to shift by (int)
+    Bits shifted past the end of the array are dropped.
+    '''
+    wordShift, bitShift = divmod(shift, 64)
+    result = words.copy()
+    if wordShift >= words.size:
+        return result
+    if bitShift == 0:
+        result[wordShift:] |= words[:words.size-wordShift]
+    else:
+        result[wordShift:] |= words[:words.size-wordShift] << np.uint64(bitShift)
+        result[wordShift+1:] |= words[:words.size-wordShift-1] >> np.uint64(64 - bitShift) # Bits carried into the next word
+    return result
+
+def reachableSums(weights, capacity, method='bigint'):
+    ''' Input data
+    weights: weight of each item; each item is used at most once (list)
+    capacity: largest total weight of interest (int)
+    method: 'bigint' (Python integer shifts) or 'numpy' (packed uint64 words) (str)
+    Returns a boolean numpy array, where entry w is True if some selection of items weighs exactly w.
+    '''
+    if method == 'bigint':
+        mask = (1 << (capacity+1)) - 1 # Drop totals above capacity
+        bits = 1 # Only the empty selection (total 0) to start
+        for w in weights:
+            if w <= capacity:
+                bits = (bits | (bits << int(w))) & mask
+        bytesLittleEndian = np.frombuffer(bits.to_bytes((capacity+8) // 8, 'little'), dtype=np.uint8)
+        return np.unpackbits(bytesLittleEndian, bitorder='little')[:capacity+1].astype(bool)
+
+    elif method == 'numpy':
+        words = np.zeros(capacity // 64 + 1, dtype=np.uint64)
+        words[0] = 1 # Only the empty selection (total 0) to start
+        for w in weights:
+            if w <= capacity:
+                words = shiftOrWords(words, int(w))
+        return np.unpackbits(words.view(np.uint8), bitorder='little')[:capacity+1].astype(bool) # Assumes little-endian words
+
+    else:
+        raise ValueError("Unknown method: " + str(method))
+
+def splitBoundedItems(weights, counts):
+    ''' Turn items that can each be chosen up to counts[i] times into 0-1 items, by binary splitting
+    weights: weight of each item (list)
+    counts: number of copies available of each item (list)
+    Returns [splitWeights, splitItems, splitCopies]: for each 0-1 item, its weight, the original
+    item (zero-based) and the number of copies it stands for.  Copies 1, 2, 4, ..., plus the
+    remainder, can add up to every number from 0 to counts[i].
+    '''
+    splitWeights = []
+    splitItems = []
+    splitCopies = []
+    for i in range(len(weights)):
+        remaining = int(counts[i])
+        piece = 1
+        while remaining > 0:
+            copies = min(piece, remaining)
+            splitWeights.append(int(weights[i]) * copies)
+            splitItems.append(i)
+            splitCopies.append(copies)
+            remaining -= copies
+            piece *= 2
+    return [splitWeights, splitItems, splitCopies]
+
+def reachableSumsBounded(weights, counts, capacity, method='bigint'):
+    ''' Input data
+    weights: weight of each item (list)
+    counts: number of copies available of each item (list)
+    capacity: largest total weight of interest (int)
+    method: as in reachableSums (str)
+    Returns a boolean numpy array, where entry w is True if some selection weighs exactly w.
+    '''
+    splitWeights, splitItems, splitCopies = splitBoundedItems(weights, counts)
+    return reachableSums(splitWeights, capacity, method)
+
+def canReachExactly(weights, target, counts=None, method='bigint'):
+    # True if some selection of items weighs exactly target (each item up to counts[i] times, if given)
+    if target < 0:
+        return False
+    if counts is None:
+        return bool(reachableSums(weights, target, method)[target])
+    return bool(reachableSumsBounded(weights, counts, target, method)[target])
+
+if __name__ == "__main__":
+    # Slide data, as in dp_knapsack_example (1).py
+    print("Reachable total weights with sack size 5: " + str(np.flatnonzero(reachableSums([2,3,4,5], 5)).tolist()))
+    print("")
+
+    # Budget data, as in budget_example_2(1).py: which total spends are possible with the available counts
+    itemCost = [50,20,25,1,100,50,1,10,1] # Item costs (in $K)
+    available = [3,3,3,1,3,1,3,3,3] # Number of available items
+    budget = 175
+    reachable = reachableSumsBounded(itemCost, available, budget)
+    print("Number of reachable spends up to $" + str(budget) + "K: " + str(int(reachable.sum())))
+    print("Can spend exactly $173K: " + str(canReachExactly(itemCost, 173, available)))
+    print("")
+
+    # Benchmark both bitset representations with thousands of items
+    rng = np.random.default_rng(1) # Set random seed
+    numItems = 5000
+    for capacity in [10**4, 10**5, 10**6]:
+        weights = rng.integers(1, capacity // 100 + 2, numItems).tolist()
+        times = {}
+        results = {}
+        for method in ['bigint', 'numpy']:
+            startTime = perf_counter()
+            results[method] = reachableSums(weights, capacity, method)
+            times[method] = perf_counter() - startTime
+        if not np.array_equal(results['bigint'], results['numpy']):
+            print("ERROR: The two bitset representations do not match.")
+        print("capacity = " + str(capacity) + ": big integer " + str(round(times['bigint'], 4)) + " sec, numpy words " +
+              str(round(times['numpy'], 4)) + " sec, " + str(int(results['bigint'].sum())) + " reachable totals")